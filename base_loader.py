@@ -1,18 +1,344 @@
-from httpx import Client
-from parsing_utils import parse_json, prettify, list_prettify
+from httpx import AsyncClient, Client, Limits, Timeout, TransportError, URL
+from episodes import ColumnarEpisodes, Episode, episode_label, episode_sort_key
+from http_cache import ResponseCache, make_key
+from download_archive import archive_key
+from downloads import (
+    DEFAULT_WORKERS,
+    get_backend,
+    get_dispatcher,
+    wait_for_jobs,
+    wanted_spec,
+)
+from parsing_utils import parse_json, prettify, list_prettify, split_options
 from beaupy import select, select_multiple
 from rich.console import Console
 from abc import abstractmethod
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+import asyncio
 import os
+import random
 import sys
+import threading
 import time
+import yaml
 from pretty import create_clean_panel
 from pretty import catppuccin_mocha
 
 console = Console()
 
+# Upper bound on simultaneous requests to any single host made through
+# get_data_many / post_data_many.
+MAX_PER_HOST = 6
+
+# Connection settings for services whose config.yaml has no 'http:' entry,
+# or leaves some of these keys out.
+DEFAULT_HTTP_SETTINGS = {
+    "timeout": 20,
+    "max_connections": 20,
+    "max_keepalive_connections": 10,
+    "keepalive_expiry": 60,
+}
+
+# Used for any key a service's config.yaml leaves out of its 'retry:' entry.
+DEFAULT_RETRY_SETTINGS = {
+    "attempts": 3,  # tries per request, including the first
+    "backoff": 0.5,  # seconds; base delay, doubled on each retry
+    "max_backoff": 10,
+    "max_retry_after": 60,  # give up rather than wait longer than this
+    "breaker_threshold": 5,  # failed requests in a row that open the breaker
+    "breaker_cooldown": 30,  # seconds an open breaker fails fast
+}
+
+# Replies worth another attempt; transport errors are retried too. A POST
+# is only retried when it is marked idempotent or may be cached.
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchError(Exception):
+    """A request that did not end in a 200 reply."""
+
+    def __init__(self, message="", url=None, status=None):
+        super().__init__(message)
+        self.url = url
+        self.status = status
+
+
+class CircuitOpenError(FetchError):
+    """Raised without a request when a host's circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker. After breaker_threshold requests in a row have failed
+    (a 5xx or transport error once their retries are spent) requests to the
+    host fail fast for breaker_cooldown seconds; the first request after that
+    is let through as a trial.
+    """
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+
+    def allow(self):
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            self.opened_at = None  # half-open: one more failure re-opens
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+
+
+def retry_delay(response, attempt, settings):
+    """
+    Seconds to wait before retry number attempt (0-based).
+
+    A Retry-After header, in seconds or as an HTTP date, is honoured;
+    otherwise exponential backoff with full jitter is used.
+    """
+    retry_after = response.headers.get("retry-after") if response is not None else None
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                when = parsedate_to_datetime(retry_after)
+                return max(0.0, when.timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    ceiling = min(settings["max_backoff"], settings["backoff"] * 2**attempt)
+    return random.uniform(0, ceiling)
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter for one host: up to burst requests at once,
+    refilled at rate requests per second. Used only on the engine loop.
+    """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def rate_limit_for(host, settings):
+    """
+    (rate, burst) for host from a service's 'rate_limit:' config, where an
+    entry under 'hosts:' overrides the service-wide rate. None if unlimited.
+    """
+    settings = settings or {}
+    limit = (settings.get("hosts") or {}).get(host) or settings
+    rate = limit.get("rate")
+    if not rate:
+        return None
+    return rate, limit.get("burst", rate)
+
+
+class ClientRegistry:
+    """
+    Process-wide pool of httpx clients, one per service.
+
+    VineFeeder builds a fresh loader on every button press; borrowing the
+    clients from here keeps TLS sessions and keep-alive connections warm
+    between actions instead of discarding them with each loader.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clients = {}
+        self.async_clients = {}
+
+    @staticmethod
+    def client_options(settings):
+        settings = {**DEFAULT_HTTP_SETTINGS, **(settings or {})}
+        return {
+            "timeout": Timeout(settings["timeout"]),
+            "limits": Limits(
+                max_connections=settings["max_connections"],
+                max_keepalive_connections=settings["max_keepalive_connections"],
+                keepalive_expiry=settings["keepalive_expiry"],
+            ),
+        }
+
+    def client(self, key, settings=None):
+        """Shared blocking httpx.Client for key."""
+        with self.lock:
+            if key not in self.clients:
+                self.clients[key] = Client(**self.client_options(settings))
+            return self.clients[key]
+
+    def async_client(self, key, settings=None):
+        """Shared httpx.AsyncClient for key; only use it on the engine loop."""
+        with self.lock:
+            if key not in self.async_clients:
+                self.async_clients[key] = AsyncClient(**self.client_options(settings))
+            return self.async_clients[key]
+
+
+clients = ClientRegistry()
+
+
+class _AsyncEngine:
+    """
+    Long-lived asyncio loop running on a daemon thread.
+
+    Every request made through BaseLoader is scheduled on this one loop, so the
+    pooled AsyncClients in the registry serve all loaders whichever thread they
+    run on, and batches of follow-up URLs can be fetched concurrently.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.host_slots = {}
+        self.breakers = {}
+        self.buckets = {}
+        self.in_flight = {}
+        try:
+            self.cache = ResponseCache()
+        except Exception as e:  # read-only home folder etc.; run uncached
+            print(f"Response cache unavailable: {e}")
+            self.cache = None
+        # SQLite reads and commits block, so they run on a thread of their
+        # own; one thread keeps them in order with each other
+        self.cache_thread = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="vinefeeder-cache"
+        )
+        thread = threading.Thread(
+            target=self.loop.run_forever, name="vinefeeder-http", daemon=True
+        )
+        thread.start()
+
+    def run(self, coro):
+        """Run a coroutine on the engine loop and block until it completes."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    async def cached(self, call, *args):
+        """Run a ResponseCache method off the loop and return its result."""
+        return await self.loop.run_in_executor(self.cache_thread, call, *args)
+
+    def host_slot(self, url):
+        """Semaphore capping concurrent requests to the host of url.
+        Only ever called from the engine loop, so needs no locking."""
+        host = URL(url).host
+        if host not in self.host_slots:
+            self.host_slots[host] = asyncio.Semaphore(MAX_PER_HOST)
+        return self.host_slots[host]
+
+    async def single_flight(self, key, make_coro):
+        """
+        Await make_coro() unless an identical call (same key) is already
+        running, in which case wait for and share its result instead.
+        """
+        task = self.in_flight.get(key)
+        if task is None:
+            task = self.loop.create_task(make_coro())
+            self.in_flight[key] = task
+            task.add_done_callback(
+                lambda done: self.in_flight.pop(key, None)
+                if self.in_flight.get(key) is done
+                else None
+            )
+        # shield: one caller giving up must not cancel the others
+        return await asyncio.shield(task)
+
+    def bucket(self, host, rate_limit):
+        """
+        Token bucket for host, or None if the host is not rate limited.
+        Hosts are shared between services, so the first caller's limit sticks.
+        """
+        if host not in self.buckets:
+            limit = rate_limit_for(host, rate_limit)
+            self.buckets[host] = TokenBucket(*limit) if limit else None
+        return self.buckets[host]
+
+    def breaker(self, host, settings):
+        """Circuit breaker for host, created with the first caller's settings."""
+        if host not in self.breakers:
+            self.breakers[host] = CircuitBreaker(
+                settings["breaker_threshold"], settings["breaker_cooldown"]
+            )
+        return self.breakers[host]
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Return the process-wide request engine, starting it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = _AsyncEngine()
+    return _engine
+
+
+_service_configs = {}
+
+
+def service_folder(loader_class):
+    """
+    Return the folder holding a service's __init__.py, or None.
+
+    Services are loaded from file by VineFeeder and are not registered in
+    sys.modules, so the folder is found from the code of the class itself.
+    """
+    for attr in vars(loader_class).values():
+        code = getattr(attr, "__code__", None)
+        if code is not None:
+            return os.path.dirname(code.co_filename)
+    return None
+
+
+def load_service_config(loader_class):
+    """Return the parsed config.yaml that sits beside a service's __init__.py."""
+    folder = service_folder(loader_class)
+    if folder is None:
+        return {}
+    config_file = os.path.join(folder, "config.yaml")
+    if config_file not in _service_configs:
+        try:
+            with open(config_file, "r") as f:
+                _service_configs[config_file] = yaml.safe_load(f) or {}
+        except OSError:
+            _service_configs[config_file] = {}
+    return _service_configs[config_file]
+
+
+def _episode_identity(episode):
+    if not isinstance(episode, Episode):
+        episode = Episode.from_dict(episode)
+    return episode.identity()
+
 
 class BaseLoader:
+    # devine's name for the service, where it differs from the folder name
+    devine_service = None
+
     def __init__(self, headers):
         """Initialize the BaseLoader class with the provided headers.
 
@@ -20,19 +346,85 @@ class BaseLoader:
             headers (dict): The headers to be used for making HTTP requests.
 
         Attributes:
-            client: An instance of the Client class for making HTTP requests.
+            client: The service's shared Client from the registry, for
+                services that make HTTP requests directly.
             headers (dict): The headers used for making HTTP requests.
+            service (str): Service folder name; keys the shared clients.
+            config (dict): The service's config.yaml.
+            http_settings (dict): Timeout and connection limits from
+                'http:' in config.yaml, over DEFAULT_HTTP_SETTINGS.
+            cache_ttl (int): Seconds a response stays fresh in the on-disk
+                cache; from 'cache: ttl:' in config.yaml, 0 disables caching.
+            retry_settings (dict): 'retry:' in config.yaml over
+                DEFAULT_RETRY_SETTINGS.
+            rate_limit (dict): 'rate_limit:' in config.yaml; requests per
+                second and burst per host, with optional per-host overrides.
+            http_stats (Counter): requests, retries, cache hits, coalesced
+                duplicates and breaker rejections paid for by this loader.
             series_data (dict): In-memory store for initial series selection.
             final_episode_data (list): List to store final episode data.
+            download_workers (int): devine processes this service may run at
+                once; from 'downloads: workers:' in config.yaml.
+            download_batch (bool): 'downloads: batch:' in config.yaml; send
+                the selected episodes of a series to devine in one run.
+            download_backend (str): 'downloads: backend:' in config.yaml;
+                'subprocess' starts devine for each download, 'inprocess'
+                reuses worker processes that have devine imported; their
+                number and lifetime come from 'pool_size:' and
+                'idle_timeout:'.
+            skip_downloaded (bool): 'downloads: skip_downloaded:' in
+                config.yaml; do not queue episodes picked from a list that
+                are already in the archive. URLs asked for directly are
+                always downloaded.
             console: An instance of the Console class for displaying output.
 
         """
-        self.client = Client(timeout=20)
         self.headers = headers
+        folder = service_folder(type(self))
+        self.service = os.path.basename(folder) if folder else type(self).__name__
+        self.config = load_service_config(type(self))
+        self.http_settings = self.config.get("http") or {}
+        self.client = clients.client(self.service, self.http_settings)
+        self.cache_ttl = (self.config.get("cache") or {}).get("ttl", 0)
+        self.retry_settings = {
+            **DEFAULT_RETRY_SETTINGS,
+            **(self.config.get("retry") or {}),
+        }
+        self.rate_limit = self.config.get("rate_limit") or {}
+        self.http_stats = Counter()
         self.series_data = {}
         self.final_episode_data = []
+        # key sets used to find duplicates without scanning the lists
+        self._key_indexes = {}
+        # series_no -> episode positions for each series; see _season_index
+        self._season_indexes = {}
+        # "columnar" keeps each series in a ColumnarEpisodes store rather
+        # than a list, for services listing thousands of episodes per series
+        self.episode_store = (self.config.get("episodes") or {}).get(
+            "store", "list"
+        )
         self.browse_video_list = []
         self.category = None
+        # devine processes this service may run at once; see downloads.py
+        download_settings = self.config.get("downloads") or {}
+        self.download_workers = download_settings.get("workers", DEFAULT_WORKERS)
+        # one devine -w run per series; see queue_series_downloads
+        self.download_batch = bool(download_settings.get("batch", False))
+        self.download_backend = download_settings.get("backend", "subprocess")
+        # leave out episodes the download archive says were fetched before
+        self.skip_downloaded = download_settings.get("skip_downloaded", True)
+        if self.download_backend == "inprocess":
+            get_backend("inprocess").configure(
+                pool_size=download_settings.get("pool_size"),
+                idle_timeout=download_settings.get("idle_timeout"),
+            )
+        self._download_jobs = []
+
+    def new_episode_list(self):
+        """An empty container for one series' episodes, per episode_store."""
+        if self.episode_store == "columnar":
+            return ColumnarEpisodes()
+        return []
 
     def clear_series_data(self):
         self.series_data = {}
@@ -40,35 +432,239 @@ class BaseLoader:
     def get_series_data(self):
         return self.series_data
 
-    def get_data(self, url, headers=None, params=None):
-        """Fetch data from a given URL."""
+    async def _request(
+        self, method, url, headers=None, cache=True, retry=True, **kwargs
+    ):
+        """
+        Make a request on the engine loop by way of the response cache.
 
+        When cache is True and the service has a cache TTL, a fresh stored
+        response is returned without touching the network; an expired one is
+        revalidated with If-None-Match / If-Modified-Since.
+        Concurrent GETs for the same URL, params and headers share a single
+        request and response object. retry=False makes a single attempt.
+        """
         if not headers:
             headers = self.headers
-        response = self.client.get(
-            url, headers=headers, params=params, follow_redirects=True
-        )
+        engine = get_engine()
+        if method == "GET":
+            key = ("GET", self._flight_key(url, headers, kwargs.get("params")))
+            if key in engine.in_flight:
+                self.http_stats["coalesced"] += 1
+            return await engine.single_flight(
+                key, lambda: self._fetch(method, url, headers, cache, retry, **kwargs)
+            )
+        return await self._fetch(method, url, headers, cache, retry, **kwargs)
+
+    @staticmethod
+    def _flight_key(url, headers, params):
+        return make_key("GET", url, params, headers=headers)
+
+    async def _fetch(self, method, url, headers, cache, retry, **kwargs):
+        engine = get_engine()
+        store = engine.cache if cache and self.cache_ttl else None
+        entry = None
+        if store:
+            key = make_key(
+                method,
+                url,
+                kwargs.get("params"),
+                kwargs.get("data"),
+                kwargs.get("json"),
+                headers,
+            )
+            entry = await engine.cached(store.get, key)
+            if entry and store.is_fresh(entry):
+                self.http_stats["cache_hits"] += 1
+                return store.to_response(entry, method, url)
+            if entry:
+                headers = {**headers, **store.conditional_headers(entry)}
+        response = await self._send(method, url, headers, retry, **kwargs)
+        if store:
+            if response.status_code == 304 and entry:
+                self.http_stats["cache_hits"] += 1
+                await engine.cached(store.refresh, key, self.cache_ttl)
+                return store.to_response(entry, method, url)
+            if response.status_code == 200:
+                await engine.cached(store.put, key, response, self.cache_ttl)
+        return response
+
+    async def _send(self, method, url, headers, retry=True, **kwargs):
+        """
+        Put a request on the wire, retrying transport errors and the replies
+        in RETRY_STATUSES unless retry is False, and tracking the host's
+        circuit breaker, which counts one failure per request however many
+        attempts it took. Every attempt waits for a token from the host's
+        rate limiter, if it has one. The last reply is returned once
+        attempts run out.
+        """
+        engine = get_engine()
+        settings = self.retry_settings
+        client = clients.async_client(self.service, self.http_settings)
+        host = URL(url).host
+        breaker = engine.breaker(host, settings)
+        bucket = engine.bucket(host, self.rate_limit)
+        attempts = settings["attempts"] if retry else 1
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                self.http_stats["breaker_rejections"] += 1
+                raise CircuitOpenError(f"{host} is not responding", url=url)
+            if bucket:
+                await bucket.acquire()
+            self.http_stats["requests"] += 1
+            response = error = None
+            try:
+                async with engine.host_slot(url):
+                    response = await client.request(
+                        method, url, headers=headers, follow_redirects=True, **kwargs
+                    )
+            except TransportError as e:
+                error = e
+            if response is not None and response.status_code < 500:
+                breaker.record_success()
+            done = attempt + 1 >= attempts or (
+                response is not None and response.status_code not in RETRY_STATUSES
+            )
+            if not done:
+                delay = retry_delay(response, attempt, settings)
+                done = delay > settings["max_retry_after"]
+            if done:
+                if response is None or response.status_code >= 500:
+                    breaker.record_failure()
+                if error is not None:
+                    raise error
+                return response
+            attempt += 1
+            self.http_stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def _get_text(self, url, headers=None, params=None):
+        response = await self._request("GET", url, headers, params=params)
         if response.status_code != 200:
-            raise Exception
+            raise FetchError(
+                f"HTTP {response.status_code} from {url}",
+                url=url,
+                status=response.status_code,
+            )
         return response.text
 
+    async def _post(
+        self, url, data=None, json=None, headers=None, cache=False, idempotent=False
+    ):
+        response = await self._request(
+            "POST",
+            url,
+            headers,
+            cache=cache,
+            retry=cache or idempotent,
+            data=data,
+            json=json,
+        )
+        if response.status_code != 200:
+            raise FetchError(
+                "Failed to retrieve data.", url=url, status=response.status_code
+            )
+        return response
+
+    @staticmethod
+    async def _gather(coros, return_exceptions):
+        return list(await asyncio.gather(*coros, return_exceptions=return_exceptions))
+
+    def get_data(self, url, headers=None, params=None):
+        """Fetch data from a given URL."""
+        return get_engine().run(self._get_text(url, headers, params))
+
+    def get_parsed(self, url, parser, headers=None, params=None):
+        """
+        Fetch url and return parser(text).
+
+        Concurrent calls for the same URL and parser share one request and
+        one parse, so treat the result as read-only. The parser runs in a
+        worker thread to keep the request engine responsive.
+        """
+        return get_engine().run(self._get_parsed(url, parser, headers, params))
+
+    async def _get_parsed(self, url, parser, headers=None, params=None):
+        engine = get_engine()
+        key = (
+            "parsed",
+            f"{parser.__module__}.{parser.__qualname__}",
+            self._flight_key(url, headers or self.headers, params),
+        )
+
+        async def fetch_and_parse():
+            text = await self._get_text(url, headers, params)
+            return await engine.loop.run_in_executor(None, parser, text)
+
+        return await engine.single_flight(key, fetch_and_parse)
+
+    def get_data_many(self, urls, headers=None, params=None, return_exceptions=False):
+        """
+        Fetch several URLs concurrently; results are returned in input order.
+
+        Parameters:
+            urls (list): URLs to fetch with GET.
+            headers (dict): Headers for every request; defaults to self.headers.
+            params (dict): Query parameters for every request.
+            return_exceptions (bool): If True a failed fetch leaves its exception
+                in the result list, otherwise the first failure is raised.
+
+        Returns:
+            list: The response text of each URL.
+        """
+        coros = [self._get_text(url, headers, params) for url in urls]
+        return get_engine().run(self._gather(coros, return_exceptions))
+
     def get_options(self, url, headers=None):
-        if not headers:
-            headers = self.headers
-        response = self.client.options(url, headers=headers, follow_redirects=True)
+        response = get_engine().run(
+            self._request("OPTIONS", url, headers, cache=False)
+        )
         if response.status_code != 200:
-            raise Exception("Failed to retrieve options-data.")
+            raise FetchError(
+                "Failed to retrieve options-data.",
+                url=url,
+                status=response.status_code,
+            )
         return response.headers
 
-    def post_data(self, url, data=None, json=None, headers=None):
-        if not headers:
-            headers = self.headers
-        response = self.client.post(
-            url, data=data, json=json, headers=headers, follow_redirects=True
+    def post_data(
+        self, url, data=None, json=None, headers=None, cache=False, idempotent=False
+    ):
+        """POST to url. Pass cache=True for idempotent queries (e.g. searches)
+        whose responses may be served from the response cache. A POST is
+        only retried on a 5xx or transport error with cache=True or
+        idempotent=True; one creating something (a session) is sent once."""
+        return get_engine().run(
+            self._post(url, data, json, headers, cache, idempotent)
         )
-        if response.status_code != 200:
-            raise Exception("Failed to retrieve data.")
-        return response
+
+    def post_data_many(self, requests, headers=None, return_exceptions=False):
+        """
+        POST several requests concurrently; responses are returned in input order.
+
+        Parameters:
+            requests (list): dicts with a "url" key and optional "data", "json",
+                "headers", "cache" and "idempotent" keys, as accepted by
+                post_data.
+            headers (dict): Default headers where a request gives none.
+            return_exceptions (bool): As for get_data_many.
+
+        Returns:
+            list: The httpx.Response of each request.
+        """
+        coros = [
+            self._post(
+                req["url"],
+                data=req.get("data"),
+                json=req.get("json"),
+                headers=req.get("headers", headers),
+                cache=req.get("cache", False),
+                idempotent=req.get("idempotent", False),
+            )
+            for req in requests
+        ]
+        return get_engine().run(self._gather(coros, return_exceptions))
 
     def parse_data(self, html):
         """Parse HTML data into JSON format."""
@@ -79,37 +675,62 @@ class BaseLoader:
         Normalize the episode dictionary for comparison.
         Focus on series_no, title, and synopsis.
         """
-        return (
-            str(episode.get("series_no", "")).strip().lower(),
-            episode.get("title", "").strip().lower(),
-            episode.get("synopsis", "").strip().lower(),
-        )
+        if not isinstance(episode, Episode):
+            episode = Episode.from_dict(episode)
+        return episode.normalized()
 
     def add_episode_remove_duplicates(self, series_name, episode):
         """Add an episode to the series in memory.
         Remove duplicates in episode stream
 
-        Expects episode to be a dict with series_no, title, and synopsis keys."""
+        Expects episode to be an Episode, or a dict with series_no, title,
+        and synopsis keys."""
+        if isinstance(episode, dict):
+            episode = Episode.from_dict(episode)
         if series_name not in self.series_data:
-            self.series_data[series_name] = []
-
-        # Normalize the current episode
-        normalized_episode = self.normalize_episode(episode)
+            self.series_data[series_name] = self.new_episode_list()
 
         # Check for duplicates using normalized episodes
-        if all(
-            self.normalize_episode(existing) != normalized_episode
-            for existing in self.series_data[series_name]
-        ):
-            self.series_data[series_name].append(episode)
-
+        self._append_unique(
+            ("series", series_name),
+            self.series_data[series_name],
+            episode,
+            self.normalize_episode,
+        )
         return
 
+    def _append_unique(self, slot, items, item, key):
+        """
+        Append item to items unless an item with the same key is already there.
+
+        The keys of each list are kept in a set under slot, so this is O(1) per
+        call. Items appended to the list by other means are picked up on the
+        next call, and the set is rebuilt if the list is replaced or shrinks.
+        Returns True if item was appended.
+        """
+        entry = self._key_indexes.get(slot)
+        if entry is None or entry[0] is not items or entry[2] > len(items):
+            entry = self._key_indexes[slot] = [items, set(), 0]
+        keys = entry[1]
+        item_key = key(item)
+        if entry[2] < len(items):
+            keys.update(map(key, items[entry[2] :]))
+            entry[2] = len(items)
+        if item_key in keys:
+            return False
+        items.append(item)
+        keys.add(item_key)
+        entry[2] = len(items)
+        return True
+
     def add_episode(self, series_name, episode):
         """Add an episode to the series in memory.
-        Episode may be Any"""
+        Episode dicts are stored as Episode records, which accept the same
+        dict-style access."""
+        if isinstance(episode, dict):
+            episode = Episode.from_dict(episode)
         if series_name not in self.series_data:
-            self.series_data[series_name] = []
+            self.series_data[series_name] = self.new_episode_list()
         self.series_data[series_name].append(episode)
         return
 
@@ -118,17 +739,20 @@ class BaseLoader:
 
     def add_final_episode(self, episode):
         """build episode list for final selction for download"""
-        if episode not in self.final_episode_data:  # Ensure no duplicates
-            self.final_episode_data.append(episode)
+        try:  # Ensure no duplicates
+            self._append_unique(
+                "final", self.final_episode_data, episode, _episode_identity
+            )
+        except TypeError:  # unhashable field values; compare one by one
+            if episode not in self.final_episode_data:
+                self.final_episode_data.append(episode)
 
     def sort_episodes(self, data):  # sort final episode data
         # ONLY for some services
-        # Sort the list by series_no and episode_no (title: will fail if title is free string)
+        # Sort the list by series_no then episode number, falling back to
+        # text for free string titles; Episodes and plain dicts alike
         try:
-            sorted_data = sorted(
-                data,
-                key=lambda x: (int(x["series_no"]), int(x["title"])),
-            )
+            sorted_data = sorted(data, key=episode_sort_key)
 
             return sorted_data
         except Exception:
@@ -156,10 +780,10 @@ class BaseLoader:
     def display_episode_list(self, series_name):
         """Use beaupy to display episodes for a selected series."""
         episodes = self.series_data.get(series_name, [])
-        episode_list = [
-            f"{ep['series_no']}, {ep['title']}, {ep['url']}, \n\t {ep['synopsis']}"
-            for ep in episodes
-        ]
+        if isinstance(episodes, ColumnarEpisodes):
+            episode_list = list(episodes.labels())
+        else:
+            episode_list = [episode_label(ep) for ep in episodes]
         selected_episodes = select_multiple(
             episode_list,
             preprocessor=lambda val: prettify(val),
@@ -174,21 +798,35 @@ class BaseLoader:
         return self.final_episode_data
 
     def display_final_episode_list(self, final_episode_data):
-        """Use beaupy to display episodes for a selected series."""
-        # episodes = self.series_data.get(series_name, [])
-        episode_list = [
-            f"{ep['series_no']}, {ep['title']}, {ep['url']}, \n\t {ep['synopsis']}"
-            for ep in final_episode_data
-        ]
-        selected_episodes = select_multiple(
-            episode_list,
-            preprocessor=lambda val: prettify(val),
+        """
+        Use beaupy to display episodes for a selected series.
+        Returns the selected episode records themselves, so a service reads
+        item["url"] rather than parsing it back out of the displayed text.
+        Episodes in the download archive are marked as downloaded.
+        """
+        labels = [episode_label(ep) for ep in final_episode_data]
+        archive = get_dispatcher().archive
+        downloaded = archive.keys(self.service) if archive is not None else set()
+        rendered = {}  # beaupy redraws every page on each key press
+
+        def render(index):
+            if index not in rendered:
+                text = prettify(labels[index])
+                url = final_episode_data[index].get("url")
+                if url and archive_key(url) in downloaded:
+                    text = f"[{catppuccin_mocha['green']}]✔ downloaded[/] {text}"
+                rendered[index] = text
+            return rendered[index]
+
+        selected_indices = select_multiple(
+            list(range(len(labels))),
+            preprocessor=render,
             minimal_count=1,
             cursor_style="pink1",
             pagination=True,
             page_size=8,
         )
-        return selected_episodes
+        return [final_episode_data[index] for index in selected_indices or ()]
 
     def get_selected_url(self, series_name):
         """Return single url for series"""
@@ -197,8 +835,45 @@ class BaseLoader:
         url = episode[0]["url"]
         return url
 
+    def _season_index(self, series_name):
+        """
+        Dict of int(series_no) -> positions of its episodes in the series, in
+        the order they were added. A ColumnarEpisodes store is indexed from its
+        series number column, without building Episode records.
+
+        Kept in step with series_data[series_name]: each call indexes only the
+        episodes added since the last one, and the index is rebuilt if the
+        list is replaced or shrinks. None if there is no such series, or a
+        series number is not a whole number, in which case callers fall back
+        to scanning the episodes.
+        """
+        items = self.series_data.get(series_name)
+        if items is None:
+            return None
+        entry = self._season_indexes.get(series_name)
+        if entry is None or entry[0] is not items or entry[2] > len(items):
+            entry = self._season_indexes[series_name] = [items, {}, 0]
+        seasons = entry[1]
+        if seasons is not None and entry[2] < len(items):
+            columnar = isinstance(items, ColumnarEpisodes)
+            for position in range(entry[2], len(items)):
+                try:
+                    if columnar:
+                        number = int(items.series_nos[position])
+                    else:
+                        number = int(items[position]["series_no"])
+                except (KeyError, TypeError, ValueError):
+                    seasons = entry[1] = None
+                    break
+                seasons.setdefault(number, []).append(position)
+        entry[2] = len(items)
+        return seasons
+
     def get_episodes_series_numbers(self, series_name):
         """Return a sorted list of series numbers for a given series name."""
+        seasons = self._season_index(series_name)
+        if seasons is not None:
+            return sorted(seasons)
         try:
             mysorted_list = sorted(
                 {int(ep["series_no"]) for ep in self.series_data[series_name]}
@@ -302,7 +977,14 @@ class BaseLoader:
                     selected_series.append(int(part))  # Store as int for comparison
 
         # Filter the episodes based on the selected series numbers
+        seasons = self._season_index(series_name)
+        episodes = self.series_data[series_name]
         for series_no in selected_series:
+            if seasons is not None:
+                for position in seasons.get(int(series_no), ()):
+                    """store in list container"""
+                    self.add_final_episode(episodes[position])
+                continue
             for episode in self.series_data[series_name]:
                 if int(episode["series_no"]) == int(series_no):
                     """store in list container"""
@@ -380,9 +1062,158 @@ class BaseLoader:
             self.receive(0, url)
             return
 
+    def download_command(self, url, extra=()):
+        """
+        The devine command downloading url, with the service's options.
+
+        extra holds arguments placed after the options, such as BBC's
+        '--range HLG'.
+        """
+        options = split_options(getattr(self, "options", None))
+        if options and options[0] == "":
+            options = []
+        service = self.devine_service or self.service
+        return ["devine", "dl", *options, *extra, service, url]
+
+    def is_downloaded(self, url):
+        """True if the download archive holds url for this service."""
+        archive = get_dispatcher().archive
+        return archive is not None and archive.contains(self.service, url)
+
+    def queue_download(self, url, extra=(), label=None, episodes=()):
+        """
+        Hand a download to the dispatcher and return its DownloadJob.
+
+        The download starts as soon as this service has a free worker;
+        wait_for_downloads() blocks until every queued download is done.
+        The url is queued even if it is in the download archive; episodes
+        picked from a list go through queue_episode_download instead.
+        """
+        job = get_dispatcher().submit(
+            self.service,
+            self.download_command(url, extra),
+            label=label,
+            workers=self.download_workers,
+            episodes=episodes,
+            backend=self.download_backend,
+        )
+        self._download_jobs.append(job)
+        return job
+
+    def queue_episode_download(self, url, extra=(), label=None):
+        """
+        queue_download for an episode picked from a list. With 'downloads:
+        skip_downloaded:' on, an episode already in the download archive
+        is not queued and None is returned.
+        """
+        if self.skip_downloaded and self.is_downloaded(url):
+            print(f"[download] already downloaded, skipping {label or url}")
+            return None
+        return self.queue_download(url, extra, label)
+
+    @staticmethod
+    def episode_numbers(episode):
+        """
+        (series, episode) as whole numbers, or None.
+
+        Episodes are only batched when the service recorded an episode_no;
+        series 100 marks specials and one-offs, which devine cannot select.
+        """
+        try:
+            numbers = int(episode["series_no"]), int(episode["episode_no"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if not 0 < numbers[0] < 100 or numbers[1] < 0:
+            return None
+        return numbers
+
+    def queue_series_downloads(self, episodes, series_url=None, url=None, extra=()):
+        """
+        Queue downloads for episodes selected from one series.
+
+        url(episode) gives an episode's download URL, episode["url"] if not
+        given. With 'downloads: batch: true' and a series_url devine accepts,
+        every episode with series and episode numbers is fetched by a single
+        'devine dl -w S01E01,S01E03-S01E07 <series_url>' run, so devine signs
+        in and lists the titles once. Other episodes are queued one by one.
+        If the batched run fails, wait_for_downloads() queues the episodes
+        devine had not finished one by one, so each is downloaded and
+        counted once. Episodes sharing their numbers with another selected
+        one (a signed version, a repeat) are queued one by one as well, as
+        -w cannot tell them apart.
+        """
+        batch = {}
+        for episode in episodes:
+            episode_url = url(episode) if url else episode.get("url")
+            if not episode_url:
+                print(f"No valid URL for {episode.get('title')}")
+                continue
+            label = episode.get("title")
+            if self.skip_downloaded and self.is_downloaded(episode_url):
+                print(f"[download] already downloaded, skipping {label}")
+                continue
+            numbers = self.episode_numbers(episode) if series_url else None
+            if self.download_batch and numbers is not None:
+                batch.setdefault(numbers, []).append((episode_url, label, extra))
+            else:
+                self.queue_download(episode_url, extra, label)
+
+        for numbers, same in list(batch.items()):
+            if len(same) > 1:
+                del batch[numbers]
+                for episode_url, label, episode_extra in same:
+                    self.queue_download(episode_url, episode_extra, label)
+        batch = {numbers: same[0] for numbers, same in batch.items()}
+
+        options = split_options(getattr(self, "options", None))
+        if len(batch) == 1 or "-w" in options or "--wanted" in options:
+            # nothing to gain, or the user's own -w would clash
+            for episode_url, label, episode_extra in batch.values():
+                self.queue_download(episode_url, episode_extra, label)
+        elif batch:
+            spec = wanted_spec(batch)
+            self.queue_download(
+                series_url,
+                ("-w", spec, *extra),
+                label=f"{series_url} -w {spec}",
+                episodes=[
+                    (self.download_command(episode_url, episode_extra), label, numbers)
+                    for numbers, (episode_url, label, episode_extra) in sorted(
+                        batch.items()
+                    )
+                ],
+            )
+
+    def wait_for_downloads(self):
+        """
+        Wait for the downloads queued by this loader and summarise them.
+
+        A batched job that fails is replaced by a job per episode.
+        """
+        jobs, self._download_jobs = self._download_jobs, []
+        return wait_for_jobs(jobs)
+
+    def download(self, url, extra=(), label=None):
+        """
+        Download a single url and wait for it, whether or not it is in the
+        download archive: it was asked for by URL or is the only episode.
+        """
+        if self.is_downloaded(url):
+            print(f"[download] downloaded before, downloading again {label or url}")
+        job = self.queue_download(url, extra, label)
+        self.wait_for_downloads()
+        return job
+
     def clean_terminal(self):
         # clear for next use
         time.sleep(1)
+        self.wait_for_downloads()
+        if self.http_stats["retries"] or self.http_stats["breaker_rejections"]:
+            print(
+                f"[info] {self.http_stats['requests']} requests, "
+                f"{self.http_stats['retries']} retries, "
+                f"{self.http_stats['breaker_rejections']} refused by circuit breaker"
+            )
         if os.name == "posix":
             # os.system('clear')
             print("Ready!")
@@ -0,0 +1,100 @@
+"""
+A synthetic 50k-episode daily series held in the default list of Episode
+records against the opt-in columnar store (episodes: store: columnar in a
+service's config.yaml): memory held, insert time, and the season lookup,
+season filter and display label paths BaseLoader runs on it.
+
+Run from the VineFeeder folder:
+
+    python benchmarks/columnar_episodes.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base_loader import BaseLoader  # noqa: E402
+from episodes import ColumnarEpisodes  # noqa: E402
+
+SERIES = "daily-soap"
+
+
+class BenchLoader(BaseLoader):
+    pass
+
+
+def episodes(count):
+    # one season a year of weekday episodes
+    for i in range(count):
+        yield {
+            "series_no": str(i // 260 + 1),
+            "title": f"{i % 260 + 1}:Episode {i + 1}",
+            "url": f"https://example.invalid/watch/daily-soap/{i + 1}",
+            "synopsis": f"Episode {i + 1}. Trouble brews in the square as old "
+            f"rivalries resurface.",
+        }
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def run(store, count):
+    loader = BenchLoader({})
+    loader.episode_store = store
+    data = list(episodes(count))
+
+    # memory is measured on a second, untimed load: tracing slows allocation
+    insert, _ = timed(lambda: [loader.add_episode(SERIES, dict(e)) for e in data])
+    loader.clear_series_data()
+    del data
+    # from fresh strings, so each store is charged for the text it keeps
+    # rather than sharing it with source dicts that outlive the count
+    tracemalloc.start()
+    for episode in episodes(count):
+        loader.add_episode(SERIES, episode)
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    seasons, numbers = timed(lambda: loader.get_episodes_series_numbers(SERIES))
+    middle = numbers[len(numbers) // 2]
+
+    def filter_season():
+        index = loader._season_index(SERIES)
+        items = loader.series_data[SERIES]
+        return [items[position] for position in index[middle]]
+
+    season, picked = timed(filter_season)
+
+    def labels():
+        items = loader.series_data[SERIES]
+        if isinstance(items, ColumnarEpisodes):
+            return list(items.labels())
+        return [
+            f"{ep['series_no']}, {ep['title']}, {ep['url']}, \n\t {ep['synopsis']}"
+            for ep in items
+        ]
+
+    label, shown = timed(labels)
+    return held, insert, seasons, season, label, len(picked), len(shown)
+
+
+def main(count=50000):
+    print(f"{count} episodes in one series")
+    for store in ("list", "columnar"):
+        held, insert, seasons, season, label, picked, shown = run(store, count)
+        print(
+            f"{store:9} held {held / 1e6:6.2f} MB  insert {insert * 1000:6.1f} ms"
+            f"  seasons {seasons * 1000:5.1f} ms"
+            f"  one season ({picked}) {season * 1000:5.2f} ms"
+            f"  labels ({shown}) {label * 1000:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
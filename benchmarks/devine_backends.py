@@ -0,0 +1,135 @@
+"""
+Per-episode overhead of the two download backends (downloads: backend: in a
+service's config.yaml) on a stub devine: 'subprocess', which starts a devine
+process per episode, against 'inprocess', which runs episodes in worker
+processes forked from a fork server that imported devine once. The
+in-process backend is timed from cold, and again with its pool already
+started, as it is after the first download of a session.
+
+The stub is a throwaway 'devine' package and launcher with a dl command for
+a STUB service that downloads nothing. At import it loads the libraries
+devine is built on that are installed here (click, rich, httpx, yaml), so
+the time measured is start-up and import cost rather than downloading.
+The benchmark imports VineFeeder itself first (vinefeeder.py where PyQt6
+is installed, base_loader and its scrapy and httpx otherwise), so its main
+script is as heavy as the real one and workers that imported it again
+would show it.
+
+Run from the VineFeeder folder:
+
+    python benchmarks/devine_backends.py
+"""
+
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloads import DownloadDispatcher, get_backend  # noqa: E402
+
+try:
+    import vinefeeder  # noqa: E402,F401
+except ImportError:
+    import base_loader  # noqa: E402,F401
+
+EPISODES = 20
+
+STUB_MAIN = '''
+import click
+import httpx  # noqa: F401
+import rich.console
+import rich.progress  # noqa: F401
+import yaml  # noqa: F401
+
+console = rich.console.Console()
+
+
+@click.group()
+def main():
+    pass
+
+
+@main.group()
+@click.option("-w", "--wanted", default=None)
+def dl(wanted):
+    pass
+
+
+@dl.command(name="STUB")
+@click.argument("url")
+def stub(url):
+    console.print(f"Downloaded {url}")
+
+
+if __name__ == "__main__":
+    main()
+'''
+
+LAUNCHER = """#!{python}
+import sys
+from devine.core.__main__ import main
+sys.exit(main())
+"""
+
+
+def make_stub(folder):
+    package = os.path.join(folder, "devine", "core")
+    os.makedirs(package)
+    for name in ("devine/__init__.py", "devine/core/__init__.py"):
+        open(os.path.join(folder, name), "w").close()
+    with open(os.path.join(package, "__main__.py"), "w") as f:
+        f.write(STUB_MAIN)
+    bin_folder = os.path.join(folder, "bin")
+    os.makedirs(bin_folder)
+    launcher = os.path.join(bin_folder, "devine")
+    with open(launcher, "w") as f:
+        f.write(LAUNCHER.format(python=sys.executable))
+    os.chmod(launcher, 0o755)
+    # the launcher finds the stub through PYTHONPATH, spawned workers
+    # through sys.path
+    os.environ["PATH"] = bin_folder + os.pathsep + os.environ["PATH"]
+    os.environ["PYTHONPATH"] = folder
+    sys.path.insert(0, folder)
+
+
+def run(backend, warm=False):
+    if warm:
+        # stop the workers left from the cold run and start a fresh pool
+        get_backend(backend).close()
+        get_backend(backend).warm()
+    dispatcher = DownloadDispatcher(max_downloads=1)
+    times = []
+    for i in range(EPISODES):
+        command = ["devine", "dl", "STUB", f"https://example.invalid/{i}"]
+        start = time.perf_counter()
+        job = dispatcher.submit("STUB", command, workers=1, backend=backend).wait()
+        times.append(time.perf_counter() - start)
+        assert job.ok and "Downloaded" in job.stdout, (job.error, job.stderr)
+    dispatcher.executor.shutdown()
+    return times
+
+
+def main():
+    with tempfile.TemporaryDirectory() as folder:
+        make_stub(folder)
+        print(f"{EPISODES} episodes, one at a time\n")
+        print(f"{'backend':<12}{'first':>10}{'median':>10}{'total':>10}")
+        for name, backend, warm in (
+            ("subprocess", "subprocess", False),
+            ("inprocess", "inprocess", False),
+            ("warm pool", "inprocess", True),
+        ):
+            times = run(backend, warm)
+            print(
+                f"{name:<12}{times[0] * 1000:>8.0f}ms"
+                f"{statistics.median(times[1:]) * 1000:>8.1f}ms"
+                f"{sum(times):>9.2f}s"
+            )
+        get_backend("inprocess").close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+Memory held by a long series stored as per-episode dicts against Episode
+records, and the time BaseLoader spends normalising and sorting each.
+
+Episode records save memory, not time. The dict rows time how BaseLoader
+normalised and sorted before Episode existed, when sorting only handled
+whole-number titles. episode_sort_key, which also orders free-text titles,
+is worked out during each sort so that records stay small. That makes
+sorting several times slower than the old key, whichever kind of record is
+sorted; the "dict, today's key" row shows the cost comes from the key.
+
+Run from the VineFeeder folder:
+
+    python benchmarks/episode_memory.py
+"""
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base_loader import BaseLoader  # noqa: E402
+from episodes import Episode, episode_sort_key  # noqa: E402
+
+
+def make_dicts(count):
+    # strings are built per episode, as they are when decoded from a page
+    return [
+        {
+            "series_no": str(i // 250 + 1),
+            "title": str(i % 250 + 1),
+            "url": f"https://example.invalid/watch/{i}",
+            "synopsis": f"Episode {i} of a long running soap.",
+        }
+        for i in range(count)
+    ]
+
+
+def make_episodes(count):
+    return [Episode.from_dict(episode) for episode in make_dicts(count)]
+
+
+def held(build, count):
+    """Bytes still allocated once build(count) has returned."""
+    tracemalloc.start()
+    data = build(count)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, data
+
+
+def timed(func, data, rounds=5):
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+# how BaseLoader normalised and sorted when episodes were dicts
+def normalize_dict(self, episode):
+    return (
+        str(episode.get("series_no", "")).strip().lower(),
+        episode.get("title", "").strip().lower(),
+        episode.get("synopsis", "").strip().lower(),
+    )
+
+
+def normalise_dicts(episodes):
+    for episode in episodes:
+        normalize_dict(None, episode)
+
+
+def sort_dicts(episodes):
+    sorted(episodes, key=lambda x: (int(x["series_no"]), int(x["title"])))
+
+
+def sort_dicts_today(episodes):
+    sorted(episodes, key=episode_sort_key)
+
+
+def normalise_episodes(episodes):
+    for episode in episodes:
+        BaseLoader.normalize_episode(None, episode)
+
+
+def sort_episodes(episodes):
+    BaseLoader.sort_episodes(None, episodes)
+
+
+def main(count=20000):
+    print(f"{count} episodes")
+    for label, build, normalise, sort in (
+        ("dict", make_dicts, normalise_dicts, sort_dicts),
+        ("dict, today's key", make_dicts, normalise_dicts, sort_dicts_today),
+        ("Episode", make_episodes, normalise_episodes, sort_episodes),
+    ):
+        size, data = held(build, count)
+        print(
+            f"{label:18} {size / 1e6:6.2f} MB  {size / count:5.0f} B/episode"
+            f"  normalise {timed(normalise, data) * 1000:6.1f} ms"
+            f"  sort {timed(sort, data) * 1000:6.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
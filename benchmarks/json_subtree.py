@@ -0,0 +1,79 @@
+"""
+Time and peak memory of decoding a whole __NEXT_DATA__ document against
+decoding only the subtrees ITVX uses, via extract_json_paths.
+
+The payload is synthetic, shaped like an ITVX programme page where the
+episode list is small next to the rest of the page data. Run from the
+VineFeeder folder:
+
+    python benchmarks/json_subtree.py
+"""
+
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from parsing_utils import JSON_BACKEND, extract_json_paths, json_loads  # noqa: E402
+
+PATHS = ("query.programmeSlug", "query.programmeId", "props.pageProps.seriesList")
+
+
+def programme_page(series=5, episodes=10, other=20000):
+    return {
+        "props": {
+            "pageProps": {
+                "seriesList": [
+                    {
+                        "titles": [
+                            {"episode": e, "series": s, "description": "d" * 200}
+                            for e in range(1, episodes + 1)
+                        ]
+                    }
+                    for s in range(1, series + 1)
+                ],
+                "rails": [
+                    {"id": i, "tags": ["a", "b", {"x": [1, 2, 3]}], "text": "t" * 300}
+                    for i in range(other)
+                ],
+            }
+        },
+        "page": "/watch/[programmeSlug]/[programmeId]",
+        "query": {"programmeSlug": "slug", "programmeId": "10a1234"},
+        "buildId": "build",
+    }
+
+
+def measure(func, rounds=5):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    elapsed = (time.perf_counter() - start) / rounds
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    text = json.dumps(programme_page())
+    whole = json_loads(text)
+    subtrees = extract_json_paths(text, *PATHS)
+    series_list = whole["props"]["pageProps"]["seriesList"]
+    assert subtrees["props.pageProps.seriesList"] == series_list
+
+    print(f"document {len(text) / 1e6:.1f} MB, backend {JSON_BACKEND}")
+    for label, func in (
+        ("whole document", lambda: json_loads(text)),
+        ("three subtrees", lambda: extract_json_paths(text, *PATHS)),
+    ):
+        elapsed, peak = measure(func)
+        print(f"{label:16} {elapsed * 1000:8.1f} ms  peak {peak / 1e6:7.2f} MB")
+
+
+if __name__ == "__main__":
+    main()
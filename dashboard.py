@@ -0,0 +1,228 @@
+import re
+import threading
+import time
+
+from rich.console import Console, Group
+from rich.live import Live
+from rich.progress_bar import ProgressBar
+from rich.table import Table
+from rich.text import Text
+
+from pretty import catppuccin_mocha
+
+# terminal colour and cursor codes in devine's output
+_ANSI = re.compile(r"\x1b\[[0-9;?]*[A-Za-z]")
+
+_PERCENT = re.compile(r"(\d{1,3}(?:\.\d+)?)\s*%")
+
+# '5.2 MB/s' from devine's progress bars, 'DL:5.2MiB' from aria2c
+_SPEED = re.compile(
+    r"(?:DL:\s*(?P<dl>\d+(?:\.\d+)?)\s*(?P<dl_unit>[KMGT]?i?B)\b)"
+    r"|(?:(?P<rate>\d+(?:\.\d+)?)\s*(?P<rate_unit>[KMGT]?i?B)/s)",
+    re.IGNORECASE,
+)
+
+_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+# words in a line of devine's output and the phase of the job they mark,
+# tried in order
+PHASES = (
+    ("licen", "licensing"),
+    ("decrypt", "decrypting"),
+    ("repack", "repacking"),
+    ("mux", "muxing"),
+    ("multiplex", "muxing"),
+    ("download", "downloading"),
+    ("subtitle", "subtitles"),
+    ("track", "listing"),
+    ("title", "listing"),
+)
+
+
+def strip_ansi(text):
+    return _ANSI.sub("", text)
+
+
+def bytes_per_second(number, unit):
+    return float(number) * _UNITS.get(unit[:1].upper() if len(unit) > 1 else "", 1)
+
+
+def format_rate(rate):
+    for unit in ("B", "KB", "MB", "GB"):
+        if rate < 1024 or unit == "GB":
+            return f"{rate:.1f} {unit}/s" if unit != "B" else f"{rate:.0f} B/s"
+        rate /= 1024
+
+
+def format_eta(seconds):
+    if seconds is None:
+        return ""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
+
+
+class JobProgress:
+    """Phase, percentage and speed of one job, read from its output lines."""
+
+    __slots__ = ("phase", "percent", "speed", "started", "phase_started", "finished")
+
+    def __init__(self):
+        self.phase = "queued"
+        self.percent = None
+        self.speed = None  # bytes per second
+        self.started = None
+        self.phase_started = None
+        self.finished = None
+
+    def update(self, line):
+        """Take one line of devine's output, with terminal codes removed."""
+        lowered = line.lower()
+        for word, phase in PHASES:
+            if word in lowered:
+                if phase != self.phase:
+                    self.phase = phase
+                    self.phase_started = time.monotonic()
+                    self.percent = None
+                break
+        percent = _PERCENT.findall(line)
+        if percent:
+            percent = min(float(percent[-1]), 100.0)
+            if self.percent == 100 and percent < 100:
+                # a finished bar followed by a new one: the next track
+                self.phase_started = time.monotonic()
+            self.percent = percent
+        speed = _SPEED.search(line)
+        if speed:
+            if speed.group("dl"):
+                self.speed = bytes_per_second(speed.group("dl"), speed.group("dl_unit"))
+            else:
+                self.speed = bytes_per_second(
+                    speed.group("rate"), speed.group("rate_unit")
+                )
+
+    def eta(self):
+        """Seconds left in the current phase, from its rate so far."""
+        started = self.phase_started or self.started
+        if not self.percent or started is None or self.finished is not None:
+            return None
+        elapsed = time.monotonic() - started
+        return elapsed * (100 - self.percent) / self.percent
+
+
+class Dashboard:
+    """
+    A rich Live table of the downloads running, with each job's phase,
+    progress, speed and ETA, and the total throughput and failures below.
+
+    It is shown while jobs are running, when the console is a terminal;
+    elsewhere jobs are reported line by line as before. Prints made while
+    it is showing appear above it.
+    """
+
+    def __init__(self, console=None, refresh_per_second=4):
+        self.console = console or Console()
+        self.refresh_per_second = refresh_per_second
+        self.lock = threading.RLock()
+        self.jobs = []
+        self.live = None
+
+    @property
+    def active(self):
+        return self.live is not None
+
+    def job_started(self, job):
+        with self.lock:
+            self.jobs.append(job)
+            if self.live is None and self.console.is_terminal:
+                # each showing of the table keeps its own list of jobs
+                jobs = self.jobs
+                self.live = Live(
+                    console=self.console,
+                    get_renderable=lambda: self.render(jobs),
+                    refresh_per_second=self.refresh_per_second,
+                )
+                self.live.start()
+
+    def all_finished(self):
+        """Called once no job is running: leave the final table showing."""
+        with self.lock:
+            live, self.live = self.live, None
+            self.jobs = []
+        if live is not None:
+            live.stop()
+
+    def render(self, jobs):
+        with self.lock:
+            jobs = list(jobs)
+        table = Table(
+            border_style=catppuccin_mocha["blue"],
+            header_style=f"bold {catppuccin_mocha['pink']}",
+            expand=False,
+        )
+        table.add_column("Episode", style=catppuccin_mocha["text"], max_width=40)
+        table.add_column("Service", style=catppuccin_mocha["text2"])
+        table.add_column("Phase", style=catppuccin_mocha["yellow"])
+        table.add_column("Progress", width=28)
+        table.add_column("Speed", style=catppuccin_mocha["cyan"], justify="right")
+        table.add_column("ETA", style=catppuccin_mocha["gray"], justify="right")
+
+        running = done = failed = 0
+        throughput = 0.0
+        etas = []
+        for job in jobs:
+            progress = job.progress
+            if progress.finished is not None:
+                if job.ok:
+                    done += 1
+                    phase = Text("done", style=catppuccin_mocha["green"])
+                else:
+                    failed += 1
+                    phase = Text("failed", style=catppuccin_mocha["red"])
+                bar = ProgressBar(
+                    total=100,
+                    completed=100 if job.ok else progress.percent or 0,
+                    width=20,
+                    complete_style=catppuccin_mocha["green" if job.ok else "red"],
+                )
+                speed = eta = ""
+            else:
+                running += 1
+                phase = progress.phase
+                bar = ProgressBar(
+                    total=100,
+                    completed=progress.percent or 0,
+                    width=20,
+                    pulse=progress.percent is None,
+                    complete_style=catppuccin_mocha["blue"],
+                    finished_style=catppuccin_mocha["green"],
+                    pulse_style=catppuccin_mocha["pink"],
+                )
+                speed = format_rate(progress.speed) if progress.speed else ""
+                throughput += progress.speed or 0
+                eta = progress.eta()
+                if eta is not None:
+                    etas.append(eta)
+                eta = format_eta(eta)
+            if progress.finished is not None and job.ok:
+                percent = " 100%"
+            elif progress.percent is None:
+                percent = ""
+            else:
+                percent = f" {progress.percent:3.0f}%"
+            table.add_row(
+                job.label, job.service, phase, Group(bar, Text(percent)), speed, eta
+            )
+
+        summary = Text.assemble(
+            (f"{running} running", catppuccin_mocha["text"]),
+            "  ",
+            (f"{done} done", catppuccin_mocha["green"]),
+            "  ",
+            (f"{failed} failed", catppuccin_mocha["red"] if failed else catppuccin_mocha["text2"]),
+            "  ",
+            (f"total {format_rate(throughput)}", catppuccin_mocha["cyan"]),
+            "  ",
+            (f"ETA {format_eta(max(etas))}" if etas else "", catppuccin_mocha["gray"]),
+        )
+        return Group(table, summary)
@@ -0,0 +1,183 @@
+"""
+The worker side of the in-process download backend (see
+downloads.InProcessBackend).
+
+Run as a script, this module is the fork server workers are started from.
+multiprocessing would have its own fork server import the launching
+script again in every worker, and for vinefeeder.py that is PyQt6, the
+GUI and the services. This module imports only devine (PRELOAD) before it
+forks, so a worker starts in milliseconds with devine already loaded.
+
+    python devine_worker.py FD
+
+FD is a Unix socket shared with the parent. For each worker the parent
+sends one end of a new socket pair over it; the server forks, and the
+child runs worker_main on that socket.
+"""
+
+import gc
+import importlib
+import logging
+import os
+import signal
+import socket
+import sys
+import traceback
+from multiprocessing.connection import Connection
+
+# modules the fork server imports once for every worker; any that are not
+# installed are skipped
+PRELOAD = [
+    "devine.core.__main__",
+    "devine.commands.dl",
+    "devine.core.services",
+]
+
+
+def serve(fd):
+    """Preload devine, then fork a worker for each socket sent over fd."""
+    for name in PRELOAD:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            pass
+    server = socket.socket(fileno=fd)
+    # workers are reaped by the system as they exit
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        try:
+            _, fds, _, _ = socket.recv_fds(server, 1, 1)
+        except OSError:
+            break
+        if not fds:  # the parent has gone
+            break
+        if os.fork() == 0:
+            server.close()
+            # devine waits on its own tools' processes
+            signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+            connection = Connection(fds[0])
+            connection.send(os.getpid())
+            try:
+                worker_main(connection)
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(0)
+        os.close(fds[0])
+
+
+def worker_main(connection, environ=None):
+    """
+    Body of an in-process worker: import devine, then run jobs sent to it.
+    environ is added to the environment first, before devine is imported.
+    """
+    os.environ.update(environ or {})
+    try:
+        from devine.core.__main__ import main
+    except Exception as e:
+        main = None
+        import_error = f"devine could not be imported ({e!r})"
+    state = _process_state()
+    while True:
+        try:
+            message = connection.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        if main is None:
+            connection.send((None, import_error))
+            continue
+        connection.send(_run_devine(main, *message))
+        _restore_process_state(state)
+
+
+def _run_devine(main, args, out_path, err_path):
+    """
+    Run devine's click command for args, with fds 1 and 2 writing to the
+    terminal or files the parent reads.
+    """
+    # never make the parent's pseudo-terminal this process's controlling one
+    flags = os.O_WRONLY | os.O_APPEND | getattr(os, "O_NOCTTY", 0)
+    out, err = os.open(out_path, flags), os.open(err_path, flags)
+    # devine's tools (aria2c, ffmpeg, ...) write straight to fds 1 and 2
+    sys.stdout.flush()
+    sys.stderr.flush()
+    saved = os.dup(1), os.dup(2)
+    os.dup2(out, 1)
+    os.dup2(err, 2)
+    try:
+        returncode = _invoke(main, args)
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        for fd, target in zip(saved, (1, 2)):
+            os.dup2(fd, target)
+            os.close(fd)
+        os.close(out)
+        os.close(err)
+    return returncode, None
+
+
+def _invoke(main, args):
+    import click
+
+    try:
+        result = main.main(args=args, prog_name="devine", standalone_mode=False)
+    except SystemExit as e:
+        code = e.code
+        if code is None:
+            return 0
+        if not isinstance(code, int):
+            print(code, file=sys.stderr)
+            return 1
+        return code
+    except click.exceptions.Exit as e:
+        return e.exit_code
+    except click.ClickException as e:
+        e.show()
+        return e.exit_code
+    except click.exceptions.Abort:
+        print("Aborted!", file=sys.stderr)
+        return 1
+    except Exception:
+        traceback.print_exc()
+        return 1
+    return result if isinstance(result, int) else 0
+
+
+def _process_state():
+    root = logging.getLogger()
+    return {
+        "environ": dict(os.environ),
+        "cwd": os.getcwd(),
+        "argv": list(sys.argv),
+        "level": root.level,
+        "handlers": {
+            name: list(logger.handlers)
+            for name, logger in [("", root), *logging.root.manager.loggerDict.items()]
+            if isinstance(logger, logging.Logger)
+        },
+    }
+
+
+def _restore_process_state(state):
+    os.environ.clear()
+    os.environ.update(state["environ"])
+    os.chdir(state["cwd"])
+    sys.argv[:] = state["argv"]
+    root = logging.getLogger()
+    root.setLevel(state["level"])
+    for name, logger in [("", root), *logging.root.manager.loggerDict.items()]:
+        if not isinstance(logger, logging.Logger):
+            continue
+        keep = state["handlers"].get(name, [])
+        for handler in logger.handlers[:]:
+            if handler not in keep:
+                logger.removeHandler(handler)
+                handler.close()
+    gc.collect()
+
+
+if __name__ == "__main__":
+    serve(int(sys.argv[1]))
@@ -0,0 +1,75 @@
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlsplit
+
+from job_journal import default_journal_path
+
+
+def default_archive_path():
+    """Location of the archive database, beside the job journal."""
+    return os.path.join(os.path.dirname(default_journal_path()), "archive.sqlite")
+
+
+def archive_key(url):
+    """
+    The part of an episode URL that names the episode: its path without a
+    trailing slash. Host, query and fragment are dropped, so the relative
+    URLs some services list and the full URLs handed to devine agree.
+    """
+    path = urlsplit(url.strip()).path
+    return path.rstrip("/") or url.strip()
+
+
+class DownloadArchive:
+    """
+    The episodes devine has downloaded successfully, per service, kept in a
+    SQLite file.
+
+    An episode is recorded, by archive_key of its URL, when its devine run
+    exits with code 0. Lookups use the table's primary key; keys() loads a
+    service's keys once into a set for marking long episode lists.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or default_archive_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS downloads (
+                service TEXT,
+                key TEXT,
+                url TEXT,
+                label TEXT,
+                downloaded REAL,
+                PRIMARY KEY (service, key)
+            ) WITHOUT ROWID"""
+        )
+        self.db.commit()
+
+    def add(self, service, url, label=None):
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO downloads VALUES (?, ?, ?, ?, ?)",
+                (service, archive_key(url), url, label, time.time()),
+            )
+            self.db.commit()
+
+    def contains(self, service, url):
+        with self.lock:
+            row = self.db.execute(
+                "SELECT 1 FROM downloads WHERE service = ? AND key = ?",
+                (service, archive_key(url)),
+            ).fetchone()
+        return row is not None
+
+    def keys(self, service):
+        """Set of archive keys recorded for service."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT key FROM downloads WHERE service = ?", (service,)
+            ).fetchall()
+        return {key for (key,) in rows}
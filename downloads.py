@@ -0,0 +1,956 @@
+import codecs
+import functools
+import glob
+import logging
+import multiprocessing
+import os
+import re
+import shlex
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from logging.handlers import RotatingFileHandler
+from multiprocessing.connection import Connection
+
+from dashboard import Dashboard, JobProgress, strip_ansi
+from download_archive import DownloadArchive
+from job_journal import DONE, FAILED, RUNNING, JobJournal, default_journal_path
+
+# devine processes allowed to run at once, across all services
+MAX_DOWNLOADS = 4
+
+# devine processes per service, unless its config.yaml sets downloads: workers
+DEFAULT_WORKERS = 2
+
+# lines of a failed job's output shown with its error
+FAILURE_TAIL = 15
+
+# jobs an in-process worker runs before it is replaced by a fresh one
+JOBS_PER_WORKER = 25
+
+# in-process workers kept started and waiting for jobs
+POOL_SIZE = 2
+
+# seconds an in-process worker may sit idle before it is stopped
+IDLE_TIMEOUT = 300
+
+# the in-process workers' fork server; see devine_worker
+WORKER_SCRIPT = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "devine_worker.py"
+)
+
+# size at which a job's log file is rolled over, and the old files kept
+LOG_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 2
+
+# job logs kept in the log folder; older ones are removed at start-up
+LOG_FILES_KEPT = 200
+
+# seconds between reads of an in-process worker's output
+TAIL_INTERVAL = 0.2
+
+# devine writes to a pseudo-terminal of this many rows and columns where
+# there is one, since rich only draws its progress bars as they move when
+# it is writing to a terminal
+TERMINAL_SIZE = (50, 120)
+
+# where there is none (Windows), rich is told its output is a terminal; the
+# in-process workers' fork server has TTY_INTERACTIVE too, as devine's
+# console is made when it is preloaded there, before there is a terminal
+TERMINAL_ENV = {
+    "TTY_COMPATIBLE": "1",
+    "TTY_INTERACTIVE": "1",
+    "FORCE_COLOR": "1",
+    "COLUMNS": str(TERMINAL_SIZE[1]),
+}
+
+# devine's progress bars redraw a line with \r rather than starting a new one
+_LINE_BREAK = re.compile(r"\r\n|\r|\n")
+
+# devine names each title, with SxxEyy for an episode, before downloading
+# it, and prints TITLE_DONE once it has been muxed
+_EPISODE = re.compile(r"\bS(\d{1,3})E(\d{1,4})\b")
+TITLE_DONE = "Title downloaded"
+
+
+class DownloadJob:
+    """One devine invocation and, once it has finished, its result and output."""
+
+    def __init__(
+        self,
+        service,
+        command,
+        label=None,
+        episodes=(),
+        backend="subprocess",
+        workers=DEFAULT_WORKERS,
+    ):
+        self.service = service
+        self.command = command
+        self.backend = backend
+        self.workers = workers
+        self.label = label or command[-1]
+        # (command, label, (series, episode)) for each episode a batched
+        # job covers; jobs journalled before the numbers were kept have None
+        self.episodes = [_episode_entry(*episode) for episode in episodes]
+        # (series, episode) devine has reported downloaded in a batched job
+        self.finished_episodes = set()
+        self._current_episode = None
+        self.journal_id = None
+        self.future = Future()
+        self.returncode = None
+        self.error = None  # exception raised starting devine, if any
+        self.progress = JobProgress()
+        self.log = None  # logging.Logger writing the job's output to a file
+        self.log_path = None
+        # the last lines of each stream, for the failure summary; all of
+        # the output is in the log file
+        self._tail = {
+            "stdout": deque(maxlen=FAILURE_TAIL),
+            "stderr": deque(maxlen=FAILURE_TAIL),
+        }
+        self._partial = {"stdout": "", "stderr": ""}
+
+    @property
+    def ok(self):
+        return self.returncode == 0
+
+    @property
+    def stdout(self):
+        """The last FAILURE_TAIL lines of stdout."""
+        return "\n".join(self._tail["stdout"])
+
+    @property
+    def stderr(self):
+        """The last FAILURE_TAIL lines of stderr."""
+        return "\n".join(self._tail["stderr"])
+
+    def feed(self, stream, text):
+        """
+        Take text devine has just written to stream ('stdout' or 'stderr').
+        Each complete line updates the job's progress and goes to its log.
+        """
+        if not text:
+            return
+        lines = _LINE_BREAK.split(self._partial[stream] + text)
+        self._partial[stream] = lines.pop()
+        for line in lines:
+            self._line(stream, line)
+
+    def close_output(self):
+        """Handle what is left of an unfinished last line and close the log."""
+        for stream, line in self._partial.items():
+            if line:
+                self._line(stream, line)
+        self._partial = {"stdout": "", "stderr": ""}
+        if self.log is not None:
+            for handler in self.log.handlers[:]:
+                self.log.removeHandler(handler)
+                handler.close()
+            self.log = None
+
+    def _line(self, stream, line):
+        line = strip_ansi(line)
+        if not line.strip():
+            return
+        self.progress.update(line)
+        if self.episodes:
+            self._track_episode(line)
+        self._tail[stream].append(line)
+        if self.log is not None:
+            self.log.info("%s %s", stream, line)
+
+    def _track_episode(self, line):
+        match = _EPISODE.search(line)
+        if match:
+            numbers = int(match[1]), int(match[2])
+            if any(numbers == entry[2] for entry in self.episodes):
+                self._current_episode = numbers
+        elif TITLE_DONE in line and self._current_episode is not None:
+            self.finished_episodes.add(self._current_episode)
+            self._current_episode = None
+
+    def unfinished_episodes(self):
+        """The episodes of a batched job devine did not report downloaded."""
+        return [
+            entry for entry in self.episodes if entry[2] not in self.finished_episodes
+        ]
+
+    @property
+    def count(self):
+        """Episodes this job downloads."""
+        return len(self.episodes) or 1
+
+    def wait(self):
+        self.future.result()
+        return self
+
+    def output_tail(self, lines=FAILURE_TAIL):
+        text = "\n".join(part for part in (self.stdout, self.stderr) if part)
+        return "\n".join(text.splitlines()[-lines:])
+
+
+class DownloadDispatcher:
+    """
+    Runs devine jobs on a bounded pool of threads, each waiting on its own
+    devine process, so downloads overlap instead of running one after another.
+
+    At most max_downloads processes run at once overall and at most `workers`
+    for any one service. Jobs beyond a service's limit wait in that service's
+    queue, not in the pool, so a service with a long queue cannot hold pool
+    threads that another service could use. Each job's output is read as
+    devine writes it, from a pseudo-terminal of its own where there is one,
+    rather than interleaved on the terminal: into the job, its log file in
+    log_folder, and the progress the dashboard shows.
+    """
+
+    def __init__(
+        self,
+        max_downloads=MAX_DOWNLOADS,
+        journal=None,
+        archive=None,
+        log_folder=None,
+        dashboard=None,
+    ):
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_downloads, thread_name_prefix="download"
+        )
+        self.journal = journal  # JobJournal, or None to keep no record
+        self.archive = archive  # DownloadArchive of episodes fetched, or None
+        self.log_folder = log_folder  # folder for per-job logs, or None
+        self.dashboard = dashboard  # Dashboard of running jobs, or None
+        self.lock = threading.Lock()
+        self.pending = {}  # service -> deque of jobs not yet started
+        self.running = {}  # service -> number of jobs started
+        self.workers = {}  # service -> per-service limit
+
+    def submit(
+        self,
+        service,
+        command,
+        label=None,
+        workers=DEFAULT_WORKERS,
+        episodes=(),
+        backend="subprocess",
+        journal_id=None,
+    ):
+        """
+        Queue a devine command for service and return its DownloadJob.
+
+        The job is written to the journal before it can start; journal_id
+        reuses the entry of a job being resumed.
+        """
+        workers = max(1, int(workers or 1))
+        job = DownloadJob(service, command, label, episodes, backend, workers)
+        if self.journal is not None:
+            job.journal_id = journal_id or self.journal.add(job)
+        with self.lock:
+            self.workers[service] = workers
+            self.pending.setdefault(service, deque()).append(job)
+            self._start_ready(service)
+        return job
+
+    def _start_ready(self, service):
+        # caller holds the lock
+        queue = self.pending[service]
+        while queue and self.running.get(service, 0) < self.workers[service]:
+            job = queue.popleft()
+            self.running[service] = self.running.get(service, 0) + 1
+            self.executor.submit(self._run, job)
+
+    def _run(self, job):
+        try:
+            quiet = False
+            try:
+                quiet = self._job_started(job)
+            except Exception as e:  # e.g. the journal locked by another window
+                print(f"[download] could not record the start of {job.label}: {e}")
+            try:
+                get_backend(job.backend).run(job)
+            except Exception as e:
+                job.error = e
+            finally:
+                job.close_output()
+                job.progress.finished = time.monotonic()
+            try:
+                self._job_finished(job)
+            except Exception as e:
+                print(f"[download] could not record the end of {job.label}: {e}")
+            report(job, quiet)
+        finally:
+            # whatever the bookkeeping did, free the slot and answer waiters
+            try:
+                with self.lock:
+                    self.running[job.service] -= 1
+                    self._start_ready(job.service)
+                    idle = not any(self.running.values())
+                    if idle and self.dashboard is not None:
+                        self.dashboard.all_finished()
+            finally:
+                job.future.set_result(job)
+
+    def _job_started(self, job):
+        """Log, show and journal a job about to run; True if quiet."""
+        if self.log_folder is not None:
+            open_job_log(job, self.log_folder)
+        job.progress.started = time.monotonic()
+        job.progress.phase = "starting"
+        if self.dashboard is not None:
+            self.dashboard.job_started(job)
+        quiet = self.dashboard is not None and self.dashboard.active
+        if not quiet:
+            print(f"[download] started  {job.label}")
+        if job.journal_id is not None:
+            self.journal.set_state(job.journal_id, RUNNING)
+        return quiet
+
+    def _job_finished(self, job):
+        """Archive and journal a job that has run."""
+        if self.archive is not None:
+            if job.ok:
+                done = job.episodes or [(job.command, job.label, None)]
+            else:
+                # the episodes a failed batch did finish
+                done = [
+                    entry for entry in job.episodes if entry[2] in job.finished_episodes
+                ]
+            for command, label, _ in done:
+                self.archive.add(job.service, command[-1], label)
+        if job.journal_id is not None:
+            self.journal.set_state(
+                job.journal_id, DONE if job.ok else FAILED, job.returncode
+            )
+
+
+class SubprocessBackend:
+    """
+    Runs every job as a 'devine dl' process of its own, writing stdout and
+    stderr to a pseudo-terminal each where there are any, or else to pipes.
+    """
+
+    def run(self, job):
+        terminals = open_terminals()
+        if terminals is None:
+            return self._run_piped(job)
+        (out, out_slave), (err, err_slave) = terminals
+        try:
+            process = subprocess.Popen(
+                job.command,
+                stdin=subprocess.DEVNULL,
+                stdout=out_slave,
+                stderr=err_slave,
+            )
+        except Exception:
+            os.close(out)
+            os.close(err)
+            raise
+        finally:
+            # the process holds the only other copies, so reads end when it exits
+            os.close(out_slave)
+            os.close(err_slave)
+        reader = threading.Thread(
+            target=_pump,
+            args=(functools.partial(os.read, err), job, "stderr"),
+            daemon=True,
+        )
+        reader.start()
+        try:
+            _pump(functools.partial(os.read, out), job, "stdout")
+            reader.join()
+        finally:
+            os.close(out)
+            os.close(err)
+        job.returncode = process.wait()
+
+    def _run_piped(self, job):
+        process = subprocess.Popen(
+            job.command,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env={**os.environ, **TERMINAL_ENV},
+        )
+        reader = threading.Thread(
+            target=_pump, args=(process.stderr.read1, job, "stderr"), daemon=True
+        )
+        reader.start()
+        with process.stdout, process.stderr:
+            _pump(process.stdout.read1, job, "stdout")
+            reader.join()
+        job.returncode = process.wait()
+
+
+def open_terminal():
+    """
+    A pseudo-terminal for devine to write to, as (master, slave) file
+    descriptors, or None where the platform has none.
+    """
+    if not hasattr(os, "openpty"):
+        return None
+    import fcntl
+    import struct
+    import termios
+
+    master, slave = os.openpty()
+    fcntl.ioctl(slave, termios.TIOCSWINSZ, struct.pack("HHHH", *TERMINAL_SIZE, 0, 0))
+    return master, slave
+
+
+def open_terminals():
+    """
+    open_terminal() for stdout and for stderr, so the two streams stay
+    apart as they would in a terminal window, or None.
+    """
+    out = open_terminal()
+    if out is None:
+        return None
+    try:
+        return out, open_terminal()
+    except Exception:
+        for fd in out:
+            os.close(fd)
+        raise
+
+
+def _pump(read, job, stream):
+    """Feed job what read(size) returns until the writing end is closed."""
+    decoder = codecs.getincrementaldecoder("utf-8")("replace")
+    while True:
+        try:
+            chunk = read(65536)
+        except OSError:  # EIO from a pseudo-terminal nothing has open any more
+            break
+        if not chunk:
+            break
+        job.feed(stream, decoder.decode(chunk))
+    job.feed(stream, decoder.decode(b"", final=True))
+
+
+class InProcessBackend:
+    """
+    Runs jobs inside long-lived worker processes that import devine once.
+
+    A 'devine dl' process spends seconds starting Python, importing devine
+    and loading its config before it downloads anything. Workers are forked
+    from a fork server that has already imported devine (devine_worker.py,
+    started on first use), so a new worker starts in milliseconds, and each
+    then
+    runs devine's click entry point for job after job, putting back the
+    process state a run changes (environment, working directory, argv and
+    logging handlers) between jobs.
+
+    pool_size workers are kept started and waiting, so a job never waits
+    for one to start. A worker is replaced after jobs_per_worker jobs, or
+    as soon as it dies, so anything the reset misses cannot build up;
+    workers left idle for idle_timeout seconds are stopped and the pool is
+    started again with the next job.
+
+    One job runs in a worker at a time; the dispatcher's thread limit caps
+    the number of workers busy at once.
+    """
+
+    def __init__(
+        self,
+        jobs_per_worker=JOBS_PER_WORKER,
+        pool_size=POOL_SIZE,
+        idle_timeout=IDLE_TIMEOUT,
+    ):
+        self.jobs_per_worker = jobs_per_worker
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.server = None  # _ForkServer, started on first use
+        self.server_lock = threading.Lock()
+        self.lock = threading.Lock()
+        self.idle = []  # _Worker waiting for a job, most recently used last
+        self.busy = 0
+        self.warming = False
+        self.sweeper = None
+
+    def configure(self, pool_size=None, idle_timeout=None):
+        """Apply a service's pool settings; the largest pool asked for wins."""
+        with self.lock:
+            if pool_size is not None:
+                self.pool_size = max(self.pool_size, int(pool_size))
+            if idle_timeout is not None:
+                self.idle_timeout = idle_timeout
+
+    def _start_worker(self):
+        if not hasattr(os, "fork"):
+            return _spawn_worker()
+        with self.server_lock:
+            if self.server is None or not self.server.alive():
+                self.server = _ForkServer()
+            server = self.server
+        return server.fork()
+
+    def warm(self):
+        """Start workers until pool_size are running or waiting."""
+        try:
+            while True:
+                with self.lock:
+                    if len(self.idle) + self.busy >= self.pool_size:
+                        return
+                worker = self._start_worker()
+                with self.lock:
+                    self.idle.insert(0, worker)
+        finally:
+            with self.lock:
+                self.warming = False
+
+    def _warm_in_background(self):
+        # caller holds the lock
+        if not self.warming:
+            self.warming = True
+            threading.Thread(target=self.warm, name="devine-pool", daemon=True).start()
+        if self.sweeper is None and self.idle_timeout:
+            self.sweeper = threading.Thread(
+                target=self._sweep, name="devine-pool-sweeper", daemon=True
+            )
+            self.sweeper.start()
+
+    def _checkout(self):
+        with self.lock:
+            worker = None
+            while self.idle and worker is None:
+                worker = self.idle.pop()
+                if not worker.alive():
+                    worker.connection.close()
+                    worker = None
+            self.busy += 1
+            self._warm_in_background()
+        if worker is None:
+            try:
+                worker = self._start_worker()
+            except Exception:
+                with self.lock:
+                    self.busy -= 1
+                raise
+        return worker
+
+    def _checkin(self, worker):
+        with self.lock:
+            self.busy -= 1
+            if worker is not None and worker.jobs < self.jobs_per_worker:
+                worker.idle_since = time.monotonic()
+                self.idle.append(worker)
+                return
+            self._warm_in_background()
+        if worker is not None:
+            worker.stop()
+
+    def _sweep(self):
+        while True:
+            time.sleep(max(1, self.idle_timeout / 4))
+            cutoff = time.monotonic() - self.idle_timeout
+            with self.lock:
+                stale = [w for w in self.idle if w.idle_since < cutoff]
+                self.idle = [w for w in self.idle if w.idle_since >= cutoff]
+            for worker in stale:
+                worker.stop()
+
+    def run(self, job):
+        # the worker writes devine's output to a pseudo-terminal, or to two
+        # files, which are read here as they are written
+        with tempfile.TemporaryDirectory(prefix="vinefeeder-") as folder:
+            terminals = open_terminals()
+            if terminals is None:
+                tails = [_Tail(folder, stream, job) for stream in ("stdout", "stderr")]
+            else:
+                tails = [
+                    _TerminalTail(terminal, stream, job)
+                    for terminal, stream in zip(terminals, ("stdout", "stderr"))
+                ]
+            paths = [tail.path for tail in tails]
+            worker = self._checkout()
+            try:
+                worker.connection.send((job.command[1:], *paths))
+                while not worker.connection.poll(TAIL_INTERVAL):
+                    for tail in tails:
+                        tail.read()
+                returncode, error = worker.connection.recv()
+            except (EOFError, OSError):
+                worker.stop()
+                self._checkin(None)
+                raise RuntimeError("devine worker process stopped unexpectedly")
+            finally:
+                for tail in tails:
+                    tail.read(final=True)
+                    tail.close()
+        worker.jobs += 1
+        self._checkin(worker)
+        if error is not None:
+            raise RuntimeError(error)
+        job.returncode = returncode
+
+    def close(self):
+        """Stop the waiting workers; the pool starts again with the next job."""
+        with self.lock:
+            workers, self.idle = self.idle, []
+        for worker in workers:
+            worker.stop()
+
+
+class _Tail:
+    """One of an in-process job's output files, fed to the job as it grows."""
+
+    def __init__(self, folder, stream, job):
+        self.path = os.path.join(folder, stream)
+        self.stream = stream
+        self.job = job
+        self.decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.file = open(self.path, "w+b", buffering=0)
+
+    def read(self, final=False):
+        data = self.file.read()
+        if data or final:
+            self.job.feed(self.stream, self.decoder.decode(data or b"", final))
+
+    def close(self):
+        self.file.close()
+
+
+class _TerminalTail:
+    """
+    A pseudo-terminal an in-process job writes to, read by a thread of its
+    own so that devine never waits on the small terminal buffer.
+    """
+
+    def __init__(self, terminal, stream, job):
+        self.master, self.slave = terminal
+        self.path = os.ttyname(self.slave)
+        self.reader = threading.Thread(
+            target=_pump,
+            args=(functools.partial(os.read, self.master), job, stream),
+            daemon=True,
+        )
+        self.reader.start()
+
+    def read(self, final=False):
+        if final and self.slave is not None:
+            # the worker has closed its copies; the reader stops at the end
+            os.close(self.slave)
+            self.slave = None
+            self.reader.join()
+
+    def close(self):
+        os.close(self.master)
+
+
+class _Worker:
+    __slots__ = ("pid", "connection", "process", "jobs", "idle_since")
+
+    def __init__(self, pid, connection, process=None):
+        self.pid = pid
+        self.connection = connection
+        self.process = process  # multiprocessing.Process where spawned
+        self.jobs = 0
+        self.idle_since = time.monotonic()
+
+    def alive(self):
+        # a waiting worker sends nothing, so anything to read is its end
+        try:
+            return not self.connection.poll()
+        except OSError:
+            return False
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except (EOFError, OSError):
+            pass
+        self.connection.close()
+        if self.process is not None:
+            self.process.join(timeout=5)
+            if self.process.is_alive():
+                self.process.kill()
+            return
+        deadline = time.monotonic() + 5
+        while _pid_exists(self.pid):
+            if time.monotonic() > deadline:
+                os.kill(self.pid, signal.SIGKILL)
+                break
+            time.sleep(0.01)
+
+
+class _ForkServer:
+    """
+    devine_worker.py running as the fork server: devine is imported there
+    once and each worker is forked from it, already warm. Unlike a
+    multiprocessing fork server it never imports the launching script.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.socket, theirs = socket.socketpair()
+        with theirs:
+            self.process = subprocess.Popen(
+                [sys.executable, WORKER_SCRIPT, str(theirs.fileno())],
+                stdin=subprocess.DEVNULL,
+                pass_fds=[theirs.fileno()],
+                env={**os.environ, "TTY_INTERACTIVE": "1"},
+            )
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def fork(self):
+        ours, theirs = socket.socketpair()
+        with theirs:
+            with self.lock:
+                socket.send_fds(self.socket, [b"w"], [theirs.fileno()])
+        connection = Connection(ours.detach())
+        try:
+            pid = connection.recv()
+        except EOFError:
+            connection.close()
+            raise RuntimeError("devine worker process could not be started")
+        return _Worker(pid, connection)
+
+
+def _spawn_worker():
+    """
+    Start a worker where there is no fork (Windows): it imports devine
+    itself, and multiprocessing imports the launching script in it too.
+    """
+    from devine_worker import worker_main
+
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe()
+    process = context.Process(
+        target=worker_main,
+        args=(child, TERMINAL_ENV),
+        name="devine-worker",
+        daemon=True,
+    )
+    process.start()
+    child.close()
+    return _Worker(process.pid, parent, process)
+
+
+def _pid_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+BACKENDS = {"subprocess": SubprocessBackend, "inprocess": InProcessBackend}
+
+
+def get_backend(name):
+    """The process-wide backend called name ('subprocess' or 'inprocess')."""
+    with _backends_lock:
+        if name not in _backends:
+            if name not in BACKENDS:
+                raise ValueError(f"Unknown download backend: {name}")
+            _backends[name] = BACKENDS[name]()
+        return _backends[name]
+
+
+def report(job, quiet=False):
+    """
+    Print how a finished job went, with the end of its output on failure.
+    quiet leaves out jobs that succeeded, for when the dashboard shows them.
+    """
+    if job.error is not None:
+        print(
+            "Error downloading video:",
+            job.error,
+            "Is devine installed correctly via 'pip install devine?",
+        )
+    elif job.ok:
+        if not quiet:
+            print(f"[download] finished {job.label}")
+    else:
+        print(f"[download] failed   {job.label} (exit code {job.returncode})")
+        tail = job.output_tail()
+        if tail:
+            print(tail)
+        if job.log_path is not None:
+            print(f"[download] full log: {job.log_path}")
+
+
+def default_log_folder():
+    """Folder of per-job logs, beside the job journal."""
+    return os.path.join(os.path.dirname(default_journal_path()), "logs")
+
+
+def open_job_log(job, folder):
+    """
+    Give job a log file in folder for all of its output, rolled over at
+    LOG_BYTES. The job is run without one if the file cannot be made.
+    """
+    name = "{}-{}-{}.log".format(
+        time.strftime("%Y%m%d-%H%M%S"),
+        re.sub(r"[^\w.-]+", "_", job.service),
+        job.journal_id or id(job),
+    )
+    path = os.path.join(folder, name)
+    try:
+        os.makedirs(folder, exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=LOG_BYTES, backupCount=LOG_BACKUPS, encoding="utf-8"
+        )
+    except OSError as e:
+        print(f"Download log unavailable: {e}")
+        return
+    handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+    # not registered with logging, so finished jobs' loggers are not kept
+    job.log = logging.Logger(f"vinefeeder.job.{name}")
+    job.log.addHandler(handler)
+    job.log_path = path
+    job.log.info("label %s", job.label)
+    job.log.info("command %s", shlex.join(job.command))
+
+
+def prune_job_logs(folder, keep=LOG_FILES_KEPT):
+    """Remove all but the newest keep job logs from folder."""
+    logs = sorted(
+        glob.glob(os.path.join(glob.escape(folder), "*.log*")),
+        key=os.path.getmtime,
+        reverse=True,
+    )
+    for path in logs[keep:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _episode_entry(command, label, numbers=None):
+    return command, label, tuple(numbers) if numbers else None
+
+
+def wanted_spec(numbers):
+    """
+    devine's -w value for (series, episode) pairs, with runs of consecutive
+    episodes in a series as ranges: [(1, 1), (1, 3), (1, 4), (1, 5)] gives
+    'S01E01,S01E03-S01E05'.
+    """
+    parts = []
+    run = []
+    for series, episode in sorted(set(numbers)):
+        if run and (series, episode - 1) != run[-1]:
+            parts.append(_wanted_range(run))
+            run = []
+        run.append((series, episode))
+    if run:
+        parts.append(_wanted_range(run))
+    return ",".join(parts)
+
+
+def _wanted_range(run):
+    first = "S{:02}E{:02}".format(*run[0])
+    if len(run) == 1:
+        return first
+    return first + "-" + "S{:02}E{:02}".format(*run[-1])
+
+
+def wait_for_jobs(jobs, dispatcher=None):
+    """
+    Wait for jobs and print how many episodes were downloaded.
+
+    A batched job that fails is replaced by a job for each episode devine
+    did not report downloaded, and those are waited for too. Returns the
+    jobs that finished, in place of any batched job that was replaced.
+    """
+    dispatcher = dispatcher or get_dispatcher()
+    finished = []
+    done_in_batches = 0  # episodes finished by batched jobs that failed
+    while jobs:
+        retries = []
+        for job in jobs:
+            job.wait()
+            if job.episodes and not job.ok and job.error is None:
+                remaining = job.unfinished_episodes()
+                done_in_batches += job.count - len(remaining)
+                print(
+                    f"[download] {job.count - len(remaining)} of the {job.count} "
+                    f"episodes of {job.label} were downloaded; downloading the "
+                    f"other {len(remaining)} one at a time"
+                )
+                for command, label, _ in remaining:
+                    retries.append(
+                        dispatcher.submit(
+                            job.service,
+                            command,
+                            label,
+                            workers=job.workers,
+                            backend=job.backend,
+                        )
+                    )
+            else:
+                finished.append(job)
+        jobs = retries
+    total = sum(job.count for job in finished) + done_in_batches
+    if total > 1:
+        failed = sum(job.count for job in finished if not job.ok)
+        print(f"[download] {total - failed} done, {failed} failed")
+    return finished
+
+
+def resume_downloads():
+    """Run the jobs the journal shows were left queued or running."""
+    dispatcher = get_dispatcher()
+    if dispatcher.journal is None:
+        print("The download journal is unavailable, so nothing can be resumed.")
+        return []
+    entries = dispatcher.journal.unfinished()
+    if not entries:
+        print("No unfinished downloads to resume.")
+        return []
+    print(f"Resuming {len(entries)} unfinished downloads.")
+    jobs = [
+        dispatcher.submit(
+            entry.service,
+            entry.command,
+            entry.label,
+            workers=entry.workers,
+            episodes=entry.episodes,
+            backend=entry.backend,
+            journal_id=entry.id,
+        )
+        for entry in entries
+    ]
+    return wait_for_jobs(jobs, dispatcher)
+
+
+_dispatcher = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher():
+    """The process-wide DownloadDispatcher, created on first use."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            try:
+                journal = JobJournal()
+            except Exception as e:  # read-only home folder etc.; keep no record
+                print(f"Download journal unavailable: {e}")
+                journal = None
+            try:
+                archive = DownloadArchive()
+            except Exception as e:
+                print(f"Download archive unavailable: {e}")
+                archive = None
+            log_folder = default_log_folder()
+            if os.path.isdir(log_folder):
+                prune_job_logs(log_folder)
+            _dispatcher = DownloadDispatcher(
+                journal=journal,
+                archive=archive,
+                log_folder=log_folder,
+                dashboard=Dashboard(),
+            )
+        return _dispatcher
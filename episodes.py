@@ -0,0 +1,275 @@
+import re
+from array import array
+
+# marks a field that was never set, so it reads as a missing key
+_MISSING = object()
+
+# a number at the start of a series number or title, e.g. '3' in '3:Title'
+_LEADING_NUMBER = re.compile(r"\s*([-+]?\d+)")
+
+FIELDS = ("series_no", "title", "url", "synopsis")
+_FIELD_SET = frozenset(FIELDS)
+
+
+def number_key(value):
+    """
+    (flag, number, text) ordering values by a leading number, then as text:
+    3 and '3' give (0, 3, ''), '3:Title' gives (0, 3, '3:Title') and free
+    text such as 'Special' gives (1, 0, 'Special'), after every number.
+    Keys always compare, whatever mix of values they come from.
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return (0, value, "")
+    if not isinstance(value, str):
+        return (1, 0, "")
+    m = _LEADING_NUMBER.match(value)
+    if m is None:
+        return (1, 0, value)
+    # text only needs keeping to order titles that share a number
+    return (0, int(m.group(1)), "" if m.end() == len(value.rstrip()) else value)
+
+
+def sort_key(series_no, title):
+    """Flat tuple ordering episodes by series, then episode number or title."""
+    return number_key(series_no) + number_key(title)
+
+
+def episode_sort_key(episode):
+    """sort_key for an Episode or a plain episode dict."""
+    return sort_key(episode.get("series_no"), episode.get("title"))
+
+
+def episode_label(episode):
+    """The text shown for an episode in the selection lists."""
+    return (
+        f"{episode['series_no']}, {episode['title']}, {episode['url']}, "
+        f"\n\t {episode['synopsis']}"
+    )
+
+
+class Episode:
+    """
+    One episode (or programme) collected by a service.
+
+    A slotted record in place of the per-episode dicts services build. It
+    answers dict-style access - episode["url"], episode.get("synopsis"),
+    "series_no" in episode - so service code written against dicts keeps
+    working. Keys other than the four fields, such as MY5's slug or TVNZ's
+    type and index, are kept in a small extras dict.
+
+    No sort key is stored: episode_sort_key works one out while a sort runs,
+    which keeps each record as small as the fields it holds.
+    """
+
+    __slots__ = ("series_no", "title", "url", "synopsis", "extras")
+
+    def __init__(
+        self,
+        series_no=_MISSING,
+        title=_MISSING,
+        url=_MISSING,
+        synopsis=_MISSING,
+        **extras,
+    ):
+        self.series_no = series_no
+        self.title = title
+        self.url = url
+        self.synopsis = synopsis
+        self.extras = extras or None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**data)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def identity(self):
+        """A hashable value that is the same for episodes that compare equal."""
+        extras = tuple(sorted(self.extras.items())) if self.extras else ()
+        return (self.series_no, self.title, self.url, self.synopsis, extras)
+
+    def normalized(self):
+        """(series_no, title, synopsis) stripped and lower cased, for comparison."""
+        series_no, title, synopsis = self.series_no, self.title, self.synopsis
+        return (
+            "" if series_no is _MISSING else str(series_no).strip().lower(),
+            "" if title is _MISSING else title.strip().lower(),
+            "" if synopsis is _MISSING else synopsis.strip().lower(),
+        )
+
+    # dict compatibility
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            value = getattr(self, key)
+        elif self.extras:
+            value = self.extras.get(key, _MISSING)
+        else:
+            value = _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            setattr(self, key, value)
+        elif self.extras is None:
+            self.extras = {key: value}
+        else:
+            self.extras[key] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def keys(self):
+        keys = [field for field in FIELDS if getattr(self, field) is not _MISSING]
+        if self.extras:
+            keys.extend(self.extras)
+        return keys
+
+    def items(self):
+        return [(key, self[key]) for key in self.keys()]
+
+    def values(self):
+        return [self[key] for key in self.keys()]
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def __eq__(self, other):
+        if isinstance(other, Episode):
+            return (
+                self.series_no == other.series_no
+                and self.title == other.title
+                and self.url == other.url
+                and self.synopsis == other.synopsis
+                and (self.extras or {}) == (other.extras or {})
+            )
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={value!r}" for key, value in self.items())
+        return f"Episode({fields})"
+
+
+class ColumnarEpisodes:
+    """
+    The episodes of one series held column by column.
+
+    An opt-in alternative to a list of Episode records for very long series
+    such as daily soaps and news strands. It keeps parallel arrays: series
+    numbers (interned), titles, URLs, and the synopses packed into one UTF-8
+    buffer with end offsets. It reads as a list of Episode records, built on
+    access, and supports append. Episodes read from it are copies, so
+    changing one does not change the store.
+    """
+
+    def __init__(self, episodes=()):
+        self.series_nos = []
+        self.titles = []
+        self.urls = []
+        self.synopsis_buffer = bytearray()
+        self.synopsis_ends = array("Q")
+        self.other_synopses = {}  # position -> a synopsis that is not a str
+        self.extras = {}  # position -> extra keys
+        self._interned = {}
+        for episode in episodes:
+            self.append(episode)
+
+    def append(self, episode):
+        if isinstance(episode, dict):
+            episode = Episode.from_dict(episode)
+        position = len(self.titles)
+        series_no = episode.series_no
+        try:
+            series_no = self._interned.setdefault(series_no, series_no)
+        except TypeError:  # unhashable; store as is
+            pass
+        self.series_nos.append(series_no)
+        self.titles.append(episode.title)
+        self.urls.append(episode.url)
+        synopsis = episode.synopsis
+        if isinstance(synopsis, str):
+            self.synopsis_buffer += synopsis.encode("utf-8", "surrogatepass")
+        else:
+            self.other_synopses[position] = synopsis
+        self.synopsis_ends.append(len(self.synopsis_buffer))
+        if episode.extras:
+            self.extras[position] = dict(episode.extras)
+
+    def synopsis(self, position):
+        if position in self.other_synopses:
+            return self.other_synopses[position]
+        start = self.synopsis_ends[position - 1] if position else 0
+        text = self.synopsis_buffer[start : self.synopsis_ends[position]]
+        return text.decode("utf-8", "surrogatepass")
+
+    def labels(self):
+        """episode_label for every episode, read straight from the columns."""
+        buffer = memoryview(self.synopsis_buffer)
+        ends = self.synopsis_ends
+        other = self.other_synopses
+        start = 0
+        for position, (series_no, title, url) in enumerate(
+            zip(self.series_nos, self.titles, self.urls)
+        ):
+            end = ends[position]
+            if series_no is _MISSING or title is _MISSING or url is _MISSING:
+                raise KeyError("series_no" if series_no is _MISSING else "title/url")
+            if position in other:
+                synopsis = other[position]
+            else:
+                synopsis = str(buffer[start:end], "utf-8", "surrogatepass")
+            start = end
+            yield f"{series_no}, {title}, {url}, \n\t {synopsis}"
+
+    def __len__(self):
+        return len(self.titles)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("episode index out of range")
+        return Episode(
+            self.series_nos[index],
+            self.titles[index],
+            self.urls[index],
+            self.synopsis(index),
+            **self.extras.get(index, {}),
+        )
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def __eq__(self, other):
+        if isinstance(other, (ColumnarEpisodes, list)):
+            return len(self) == len(other) and all(
+                mine == theirs for mine, theirs in zip(self, other)
+            )
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"<ColumnarEpisodes of {len(self)} episodes>"
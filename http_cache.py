@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+from httpx import Request, Response, URL
+
+# Upper bound on the total size of stored response bodies.
+# Least recently used entries are evicted once this is exceeded.
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Headers describing the wire encoding; bodies are stored decoded so these
+# must not be replayed on a cached response.
+_DROP_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+CacheEntry = namedtuple(
+    "CacheEntry", "status headers body expires etag last_modified"
+)
+
+
+def default_cache_path():
+    """Location of the cache database in the user's cache folder."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        base = os.environ.get("XDG_CACHE_HOME", os.path.expanduser("~/.cache"))
+    return os.path.join(base, "vinefeeder", "http_cache.sqlite")
+
+
+def make_key(method, url, params=None, data=None, json_body=None, headers=None):
+    """
+    Cache key for a request: method, full URL, request headers and any
+    request body. Services send session or DRM headers that change the
+    response to the same URL, so every header the request carries counts.
+    """
+    full_url = str(URL(url, params=params)) if params else str(url)
+    body = ""
+    if data is not None or json_body is not None:
+        body = json.dumps([data, json_body], sort_keys=True, default=str)
+    sent = ""
+    if headers:
+        sent = json.dumps(
+            sorted((str(name).lower(), str(value)) for name, value in headers.items())
+        )
+    return hashlib.sha256(
+        f"{method}\n{full_url}\n{sent}\n{body}".encode()
+    ).hexdigest()
+
+
+class ResponseCache:
+    """
+    Size-bounded LRU store of HTTP responses kept in a SQLite file.
+
+    Entries carry an expiry time from the service TTL. Expired entries are not
+    served directly but keep their ETag / Last-Modified validators so the next
+    request can be revalidated with a conditional GET.
+
+    Every method blocks on SQLite, so the request engine calls them from a
+    thread of their own rather than on its event loop. The size of the
+    stored bodies is kept as a running total, read from the file once.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.path = path or default_cache_path()
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                size INTEGER,
+                expires REAL,
+                etag TEXT,
+                last_modified TEXT,
+                last_used REAL
+            )"""
+        )
+        self.db.execute(
+            "CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)"
+        )
+        self.db.commit()
+        (self.total_size,) = self.db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()
+
+    def get(self, key):
+        """Return the CacheEntry for key, fresh or not, or None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT status, headers, body, expires, etag, last_modified "
+                "FROM responses WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?", (time.time(), key)
+            )
+            self.db.commit()
+        status, headers, body, expires, etag, last_modified = row
+        return CacheEntry(status, json.loads(headers), body, expires, etag, last_modified)
+
+    def put(self, key, response, ttl):
+        """Store a 200 response for ttl seconds."""
+        headers = [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in _DROP_HEADERS
+        ]
+        body = response.content
+        now = time.time()
+        with self.lock:
+            old = self.db.execute(
+                "SELECT size FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if old is not None:
+                self.total_size -= old[0]
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    key,
+                    str(response.request.url),
+                    response.status_code,
+                    json.dumps(headers),
+                    body,
+                    len(body),
+                    now + ttl,
+                    response.headers.get("etag"),
+                    response.headers.get("last-modified"),
+                    now,
+                ),
+            )
+            self.total_size += len(body)
+            self._evict()
+            self.db.commit()
+
+    def refresh(self, key, ttl):
+        """Extend an entry after the server confirmed it unchanged (304)."""
+        now = time.time()
+        with self.lock:
+            self.db.execute(
+                "UPDATE responses SET expires = ?, last_used = ? WHERE key = ?",
+                (now + ttl, now, key),
+            )
+            self.db.commit()
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM responses")
+            self.db.commit()
+            self.db.execute("VACUUM")
+            self.total_size = 0
+
+    def _evict(self):
+        # caller holds the lock
+        if self.total_size <= self.max_bytes:
+            return
+        excess = self.total_size - self.max_bytes
+        freed = 0
+        stale = []
+        for key, size in self.db.execute(
+            "SELECT key, size FROM responses ORDER BY last_used"
+        ):
+            stale.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self.db.executemany("DELETE FROM responses WHERE key = ?", stale)
+        self.total_size -= freed
+
+    @staticmethod
+    def is_fresh(entry):
+        return entry.expires > time.time()
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Revalidation headers for an expired entry, if it has validators."""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    @staticmethod
+    def to_response(entry, method, url):
+        """Rebuild an httpx.Response from a stored entry."""
+        return Response(
+            entry.status,
+            headers=entry.headers,
+            content=entry.body,
+            request=Request(method, url),
+        )
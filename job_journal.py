@@ -0,0 +1,119 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+# finished jobs are dropped from the journal after this many days
+KEEP_DAYS = 30
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+JournalEntry = namedtuple(
+    "JournalEntry", "id service command label episodes workers backend state"
+)
+
+
+def default_journal_path():
+    """Location of the journal database in the user's state folder."""
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA", os.path.expanduser("~"))
+    else:
+        base = os.environ.get("XDG_STATE_HOME", os.path.expanduser("~/.local/state"))
+    return os.path.join(base, "vinefeeder", "jobs.sqlite")
+
+
+class JobJournal:
+    """
+    Record of every download job kept in a SQLite file.
+
+    A job is written as queued before it is handed to a worker, then moves
+    to running and on to done or failed. Jobs still queued or running when
+    VineFeeder stops - closed, crashed or the terminal lost - are what
+    'vinefeeder.py --resume' runs again, from the devine command stored
+    here, so nothing has to be searched for or listed again.
+    """
+
+    def __init__(self, path=None, keep_days=KEEP_DAYS):
+        self.path = path or default_journal_path()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            """CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                service TEXT,
+                command TEXT,
+                label TEXT,
+                episodes TEXT,
+                workers INTEGER,
+                backend TEXT,
+                state TEXT,
+                returncode INTEGER,
+                created REAL,
+                updated REAL
+            )"""
+        )
+        self.db.execute("CREATE INDEX IF NOT EXISTS jobs_state ON jobs (state)")
+        self.db.execute(
+            "DELETE FROM jobs WHERE state IN (?, ?) AND updated < ?",
+            (DONE, FAILED, time.time() - keep_days * 86400),
+        )
+        self.db.commit()
+
+    def add(self, job):
+        """Record a DownloadJob as queued and return its journal id."""
+        now = time.time()
+        with self.lock:
+            cursor = self.db.execute(
+                "INSERT INTO jobs (service, command, label, episodes, workers, "
+                "backend, state, created, updated) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job.service,
+                    json.dumps(job.command),
+                    job.label,
+                    json.dumps(job.episodes),
+                    job.workers,
+                    job.backend,
+                    QUEUED,
+                    now,
+                    now,
+                ),
+            )
+            self.db.commit()
+        return cursor.lastrowid
+
+    def set_state(self, job_id, state, returncode=None):
+        with self.lock:
+            self.db.execute(
+                "UPDATE jobs SET state = ?, returncode = ?, updated = ? WHERE id = ?",
+                (state, returncode, time.time(), job_id),
+            )
+            self.db.commit()
+
+    def unfinished(self):
+        """JournalEntry for every job left queued or running, oldest first."""
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT id, service, command, label, episodes, workers, backend, "
+                "state FROM jobs WHERE state IN (?, ?) ORDER BY id",
+                (QUEUED, RUNNING),
+            ).fetchall()
+        return [
+            JournalEntry(
+                job_id,
+                service,
+                json.loads(command),
+                label,
+                [tuple(episode) for episode in json.loads(episodes)],
+                workers,
+                backend,
+                state,
+            )
+            for job_id, service, command, label, episodes, workers, backend, state in rows
+        ]
@@ -1,13 +1,332 @@
 import json
+import re
+import jmespath
 from scrapy import Selector
 
+# JSON decoding backend: orjson or msgspec when installed, stdlib otherwise.
+# Both decode large __NEXT_DATA__ style payloads several times faster.
+try:
+    import orjson
+
+    JSON_BACKEND = "orjson"
+    _fast_loads = orjson.loads
+    _fast_errors = (orjson.JSONDecodeError,)
+except ImportError:
+    try:
+        import msgspec
+
+        JSON_BACKEND = "msgspec"
+        _fast_loads = msgspec.json.decode
+        _fast_errors = (msgspec.DecodeError,)
+    except ImportError:
+        JSON_BACKEND = "json"
+        _fast_loads = None
+        _fast_errors = ()
+
+
+def json_loads(data):
+    """
+    Decode a JSON str or bytes with the fastest available backend.
+
+    Input the fast backend rejects (NaN, integers wider than 64 bits, invalid
+    documents) is retried with the stdlib, so results and errors are the same
+    as json.loads: a bad document raises json.JSONDecodeError.
+    """
+    if _fast_loads is not None:
+        try:
+            return _fast_loads(data)
+        except _fast_errors:
+            pass
+    return json.loads(data)
+
+
+# attribute="value" pairs inside an opening <script ...> tag
+_SCRIPT_ATTR = re.compile(
+    r"""([^\s=/>]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?"""
+)
+
+# normalise_js patterns. Each match is a run of text needing no change
+# (plain JSON and whole string tokens that hold nothing to strip) followed by
+# one target: a bare undefined, a string token to clean, a zero-width
+# non-joiner or CRLF, or the end of the text. The runs are consumed inside the
+# regex engine, so Python only sees the targets, and nothing inside a string
+# is ever mistaken for a literal. A lone quote only appears in broken input.
+def _js_pattern(clean):
+    if clean:
+        skip = (
+            r'[^"u\r\u200c]++|u(?!ndefined\b)|(?<=\w)u|\r(?!\n)'
+            r'|"[^"\\\r\u200c]*+(?:\\.[^"\\\r\u200c]*+)*+"'
+        )
+        target = r'"[^"\\]*+(?:\\.[^"\\]*+)*+"|\bundefined\b|\u200c|\r\n|"|\Z'
+    else:
+        skip = r'[^"u]++|u(?!ndefined\b)|(?<=\w)u|"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+        target = r'\bundefined\b|"|\Z'
+    return f"(?:{skip})*+(?P<target>{target})"
+
+
+_JS_TOKENS = {
+    (str, clean): re.compile(_js_pattern(clean)) for clean in (False, True)
+}
+_JS_TOKENS.update(
+    {
+        (bytes, clean): re.compile(
+            # the pattern is ASCII apart from the zero-width non-joiner
+            _js_pattern(clean).replace(r"\u200c", r"\xe2\x80\x8c").encode()
+        )
+        for clean in (False, True)
+    }
+)
+_JS_PARTS = {
+    # quote, undefined, null, zero-width non-joiner, CRLF, empty
+    str: ('"', "undefined", "null", "\u200c", "\r\n", ""),
+    bytes: (b'"', b"undefined", b"null", b"\xe2\x80\x8c", b"\r\n", b""),
+}
+
+
+def normalise_js(data, start=0, end=None, clean=False):
+    """
+    Turn the JS object literal in data[start:end] into valid JSON in one pass.
+
+    Bare undefined becomes null; text inside string tokens is left alone, so
+    a synopsis mentioning "undefined" survives. With clean=True zero-width
+    non-joiners and CRLFs are also dropped, inside strings too.
+    Works on str or bytes and returns the same type. Nothing is copied but
+    the result: if there is nothing to rewrite that is just the slice.
+    """
+    kind = bytes if isinstance(data, bytes) else str
+    quote, undefined, null, zwnj, crlf, empty = _JS_PARTS[kind]
+    if end is None:
+        end = len(data)
+    needs_cleaning = clean and (
+        data.find(zwnj, start, end) >= 0 or data.find(crlf, start, end) >= 0
+    )
+    if data.find(undefined, start, end) < 0 and not needs_cleaning:
+        return data if start == 0 and end == len(data) else data[start:end]
+
+    pieces = []
+    last = start
+    for m in _JS_TOKENS[kind, clean].finditer(data, start, end):
+        token = m.group("target")
+        if token == undefined:
+            replacement = null
+        elif token[:1] == quote and len(token) > 1:
+            replacement = token.replace(zwnj, empty).replace(crlf, empty)
+        elif token in (zwnj, crlf):
+            replacement = empty
+        else:  # end of text, or a stray quote
+            continue
+        pieces.append(data[last : m.start("target")])
+        pieces.append(replacement)
+        last = m.end("target")
+    pieces.append(data[last:end])
+    return empty.join(pieces)
+
+
+def js_value_bounds(text, prefix=None):
+    """
+    (start, end) of the value in a script such as 'window.__PARAMS__ = {...};'
+    i.e. text without surrounding whitespace, a leading prefix and trailing
+    semicolons, found without copying text.
+    """
+    start, end = 0, len(text)
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and (text[end - 1].isspace() or text[end - 1] == ";"):
+        end -= 1
+    if prefix and text.startswith(prefix, start, end):
+        start += len(prefix)
+    return start, end
+
+
+# extract_json_paths patterns. _NEXT_BRACKET consumes everything up to the
+# next bracket that opens a container nested deeper than _NESTED_DEPTH, or
+# closes one, in a single regex step. Skipping a value therefore costs a
+# Python iteration only per deeply nested bracket, not per character.
+_STRING = r'"[^"\\]*+(?:\\.[^"\\]*+)*+"'
+_NESTED_DEPTH = 6
+
+
+def _nested_patterns(depth):
+    atom = rf'[^"\[\]{{}}]++|{_STRING}'
+    container = rf"[\[{{](?:{atom})*+[\]}}]"
+    for _ in range(depth - 1):
+        container = rf"[\[{{](?:{atom}|{container})*+[\]}}]"
+    return container, rf"(?:{atom}|{container})*+([\[\]{{}}])"
+
+
+_CONTAINER, _NEXT_BRACKET = map(re.compile, _nested_patterns(_NESTED_DEPTH))
+_STRING_TOKEN = re.compile(_STRING)
+_SCALAR = re.compile(rf'{_STRING}|[^\s,\]}}]++')
+_SPACE = re.compile(r"\s*+")
+
+# marks a trie node whose whole value is wanted
+_WANTED = object()
+
+
+def _path_trie(paths):
+    trie = {}
+    for path in paths:
+        node = trie
+        for segment in path.split("."):
+            node = node.setdefault(segment, {})
+        node[_WANTED] = path
+    return trie
+
+
+def _skip_container(text, pos, depth=0):
+    """Position after the container opening at pos (or already depth deep)."""
+    if depth == 0:
+        m = _CONTAINER.match(text, pos)
+        if m is not None:
+            return m.end()
+        pos, depth = pos + 1, 1
+    match = _NEXT_BRACKET.match
+    while True:
+        m = match(text, pos)
+        if m is None:
+            raise ValueError(f"Unterminated JSON container near {pos}")
+        pos = m.end()
+        if m.group(1) in "[{":
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return pos
+
+
+def _skip_value(text, pos, end):
+    if text[pos] in "[{":
+        return _skip_container(text, pos)
+    m = _SCALAR.match(text, pos, end)
+    if m is None:
+        raise ValueError(f"Expected a JSON value at {pos}")
+    return m.end()
+
+
+def _decode_slice(text, start, end):
+    return json_loads(normalise_js(text, start, end))
+
+
+def _count_wanted(node):
+    return sum(
+        1 if key is _WANTED else _count_wanted(child) for key, child in node.items()
+    )
+
+
+def _resolve(value, node, found):
+    # paths below one already decoded are looked up in the decoded value
+    for segment, child in node.items():
+        if segment is _WANTED:
+            found[child] = value
+            continue
+        try:
+            item = value[int(segment)] if isinstance(value, list) else value[segment]
+        except (KeyError, IndexError, ValueError, TypeError):
+            continue
+        _resolve(item, child, found)
+
+
+def _walk(text, pos, end, node, found):
+    """
+    Walk the container at pos, decoding only the members named in node.
+    Returns the position after the container.
+    """
+    space = _SPACE.match
+    is_object = text[pos] == "{"
+    closer = "}" if is_object else "]"
+    remaining = _count_wanted(node)
+    pos = space(text, pos + 1, end).end()
+    index = 0
+    while pos < end and text[pos] != closer:
+        if is_object:
+            m = _STRING_TOKEN.match(text, pos, end)
+            if m is None:
+                raise ValueError(f"Expected an object key at {pos}")
+            key = m.group()
+            key = json.loads(key) if "\\" in key else key[1:-1]
+            pos = space(text, m.end(), end).end()
+            if text[pos] != ":":
+                raise ValueError(f"Expected ':' at {pos}")
+            pos = space(text, pos + 1, end).end()
+        else:
+            key = str(index)
+            index += 1
+
+        child = node.get(key)
+        if child is None:
+            pos = _skip_value(text, pos, end)
+        elif _WANTED in child:
+            value_end = _skip_value(text, pos, end)
+            _resolve(_decode_slice(text, pos, value_end), child, found)
+            remaining -= _count_wanted(child)
+            pos = value_end
+        elif text[pos] in "[{":
+            pos = _walk(text, pos, end, child, found)
+            remaining -= _count_wanted(child)
+        else:
+            pos = _skip_value(text, pos, end)
+
+        if remaining <= 0:
+            # everything wanted here is found; skip the rest unread
+            return _skip_container(text, pos, depth=1)
+        pos = space(text, pos, end).end()
+        if pos < end and text[pos] == ",":
+            pos = space(text, pos + 1, end).end()
+    if pos >= end:
+        raise ValueError("Unterminated JSON container")
+    return pos + 1
+
+
+def extract_json_paths(text, *paths, start=0, end=None):
+    """
+    Decode only the parts of a JSON (or JS object literal) document named by
+    dotted paths such as 'props.pageProps.seriesList'; numeric segments index
+    arrays. Everything else is skipped by a bracket scan and never decoded.
+
+    Returns a dict of path -> value. Paths that are not in the document are
+    left out. Raises ValueError on a malformed document.
+    """
+    if end is None:
+        end = len(text)
+    found = {}
+    pos = _SPACE.match(text, start, end).end()
+    if pos < end and text[pos] in "[{":
+        _walk(text, pos, end, _path_trie(paths), found)
+    return found
+
+
+# jmespath expressions compiled once per process, keyed by (service, name).
+# Services register their queries at import and search with search_query.
+_QUERIES = {}
+
+
+def register_query(service, name, expression):
+    """
+    Compile a jmespath expression and store it under (service, name).
+
+    Compiling at import means a malformed query stops the service module
+    loading, rather than failing mid-search. It is not a speed-up:
+    jmespath.search keeps its own cache of parsed expressions.
+
+    Registering the same expression again reuses the compiled one.
+    """
+    compiled = _QUERIES.get((service, name))
+    if compiled is None or compiled.expression != expression:
+        compiled = _QUERIES[(service, name)] = jmespath.compile(expression)
+    return compiled
+
+
+def search_query(service, name, data):
+    """Run the registered query (service, name) against data."""
+    return _QUERIES[(service, name)].search(data)
+
 
 def parse_json(html):
     try:
-        # Replace 'undefined' with 'null' to make the JSON valid
-        json_data = html.replace("undefined", "null")
+        # Replace bare 'undefined' with 'null' to make the JSON valid
+        json_data = normalise_js(html)
         # Parse the JSON string
-        parsed_json = json.loads(json_data)
+        parsed_json = json_loads(json_data)
         return parsed_json
 
     except json.JSONDecodeError as e:
@@ -18,6 +337,180 @@ def parse_json(html):
         return None
 
 
+def _script_attrs(tag):
+    """Attributes of an opening script tag (without '<script' and '>')."""
+    return {
+        m.group(1).lower(): next((v for v in m.group(2, 3, 4) if v is not None), "")
+        for m in _SCRIPT_ATTR.finditer(tag)
+    }
+
+
+def iter_scripts(html):
+    """
+    Yield (attrs, start, end) for every <script> element in html, where
+    html[start:end] is the script's text. Works on str or bytes.
+
+    A plain substring scan, so no DOM is built; only the opening tag is
+    decoded to read its attributes. Tags must be lower case ('<script'),
+    as they are on every page the services read.
+    """
+    if isinstance(html, bytes):
+        open_tag, close_tag, gt = b"<script", b"</script", b">"
+        boundary = (b" ", b"\t", b"\n", b"\r", b"/", b">")
+    else:
+        open_tag, close_tag, gt = "<script", "</script", ">"
+        boundary = (" ", "\t", "\n", "\r", "/", ">")
+    pos = 0
+    while True:
+        pos = html.find(open_tag, pos)
+        if pos < 0:
+            return
+        tag_start = pos + len(open_tag)
+        if html[tag_start : tag_start + 1] not in boundary:
+            pos = tag_start  # not a script tag, e.g. <scripts>
+            continue
+        tag_end = html.find(gt, tag_start)
+        if tag_end < 0:
+            return
+        end = html.find(close_tag, tag_end + 1)
+        if end < 0:
+            return
+        tag = html[tag_start:tag_end]
+        if isinstance(tag, bytes):
+            tag = tag.decode("utf-8", "replace")
+        yield _script_attrs(tag.rstrip("/")), tag_end + 1, end
+        pos = end + len(close_tag)
+
+
+def find_script_text(html, discriminator=None, script_id=None, index=0):
+    """
+    Fast replacement for the Selector xpath lookups below.
+
+    Returns the text of the index-th script whose text contains discriminator,
+    or, when script_id is given, of the index-th
+    <script id="script_id" type="application/json">. Only that script's slice
+    is copied (and decoded, for bytes input). None if there is no such script.
+    """
+    return ParsedPage.of(html).script_text(
+        discriminator, script_id, index, fallback=False
+    )
+
+
+def _xpath_script_text(html, xpath, index=0):
+    """Selector (lxml) fallback for find_script_text."""
+    if isinstance(html, bytes):
+        html = html.decode("utf-8")
+    scripts = Selector(text=html).xpath(f"{xpath}/text()")
+    if 0 <= index < len(scripts):
+        return scripts[index].get()
+    return None
+
+
+class ParsedPage:
+    """
+    An HTML page (str or bytes) with its <script> elements found in one scan.
+
+    Scripts are indexed by id when the page is scanned and by discriminator
+    the first time one is asked for. Decoded payloads are memoized, so reading
+    several scripts, indices or paths from one page scans it once and decodes
+    each script once. Payloads are shared between calls: copy before changing.
+    """
+
+    # the most recently used page, reused by the module level functions
+    _last = None
+
+    def __init__(self, html):
+        self.html = html
+        self.scripts = list(iter_scripts(html))
+        self.ids = {}
+        for position, (attrs, _, _) in enumerate(self.scripts):
+            if "id" in attrs and attrs.get("type") == "application/json":
+                self.ids.setdefault(attrs["id"], []).append(position)
+        self.containing = {}
+        self.decoded = {}
+
+    @classmethod
+    def of(cls, html):
+        """The ParsedPage for html, reusing the last one for the same document."""
+        page = cls._last
+        if page is None or page.html is not html:
+            page = cls._last = cls(html)
+        return page
+
+    def script_text(
+        self, discriminator=None, script_id=None, index=0, fallback=True
+    ):
+        """
+        Text of the index-th script containing discriminator, or of the
+        index-th <script id="script_id" type="application/json">. If the scan
+        finds none, and fallback is set, Scrapy's Selector is tried, which
+        also copes with markup the scan does not, such as upper case tags.
+        """
+        if script_id is not None:
+            positions = self.ids.get(script_id, ())
+            xpath = f'//script[@id="{script_id}" and @type="application/json"]'
+        else:
+            positions = self.containing.get(discriminator)
+            if positions is None:
+                needle = discriminator
+                if isinstance(self.html, bytes):
+                    needle = discriminator.encode()
+                positions = self.containing[discriminator] = [
+                    position
+                    for position, (_, start, end) in enumerate(self.scripts)
+                    if start != end and self.html.find(needle, start, end) >= 0
+                ]
+            xpath = f'//script[contains(text(), "{discriminator}")]'
+        if 0 <= index < len(positions):
+            _, start, end = self.scripts[positions[index]]
+            text = self.html[start:end]
+            return text.decode("utf-8") if isinstance(text, bytes) else text
+        if fallback:
+            return _xpath_script_text(self.html, xpath, index)
+        return None
+
+    def params_json(self, discriminator="__PARAMS__", index=0):
+        """
+        Decoded value of a <script>window.__PARAMS__ = ...;</script> style
+        script, or None if there is no such script.
+        """
+        key = ("params", discriminator, index)
+        if key not in self.decoded:
+            text = self.script_text(discriminator=discriminator, index=index)
+            if text is None:
+                return None
+            # Skip 'window.__PARAMS__ =' and trailing semicolon, then replace
+            # bare 'undefined' with 'null' to make the JSON valid
+            start, end = js_value_bounds(text, f"window.{discriminator} = ")
+            self.decoded[key] = json_loads(normalise_js(text, start, end, clean=True))
+        return self.decoded[key]
+
+    def script_json(self, script_id, index=0, paths=()):
+        """
+        Decoded value of a <script id="script_id" type="application/json">,
+        or None if there is no such script. With paths, only those subtrees
+        are decoded and a dict of path -> value is returned; if the whole
+        script was already decoded they are looked up in that instead.
+        """
+        paths = tuple(paths)
+        key = ("id", script_id, index, paths)
+        if key not in self.decoded:
+            whole = self.decoded.get(("id", script_id, index, ()))
+            if paths and whole is not None:
+                value = {}
+                _resolve(whole, _path_trie(paths), value)
+            else:
+                text = self.script_text(script_id=script_id, index=index)
+                if text is None:
+                    return None
+                if paths:
+                    value = extract_json_paths(text, *paths)
+                else:
+                    value = json_loads(normalise_js(text))
+            self.decoded[key] = value
+        return self.decoded[key]
+
+
 def extract_params_json(html, discriminator="__PARAMS__", index=0):
     """
     For scripts like <script>window.__PARAMS__ = ...;</script>
@@ -36,39 +529,7 @@ def extract_params_json(html, discriminator="__PARAMS__", index=0):
               was found, or if the JSON could not be parsed.
     """
     try:
-        # Use Scrapy's Selector to locate the script tag containing "__PARAMS__"
-        sel = Selector(text=html)
-
-        # Extract the script content that contains 'window.__PARAMS__'
-        # selected_script = sel.xpath(f'//script[contains(text(), "{discriminator}")]/text()').extract_first()
-
-        scripts = sel.xpath(f'//script[contains(text(), "{discriminator}")]/text()')
-
-        if 0 <= index < len(scripts):
-            selected_script = scripts[index].get()
-        else:
-            return None
-
-        # Remove 'window.__PARAMS__ =' and trailing semicolon
-        json_data = (
-            selected_script.strip()
-            .replace(f"window.{discriminator} = ", "")
-            .rstrip(";")
-            .replace("\u200c", "")
-            .replace("\r\n", "")
-        )
-
-        # Replace 'undefined' with 'null' to make the JSON valid
-        json_data = json_data.replace("undefined", "null")
-
-        # Parse the JSON string
-        parsed_json = json.loads(json_data)
-
-        # Debugging: Print parsed JSON to verify it worked
-        # print("Parsed JSON:")
-        # print(json.dumps(parsed_json, indent=4))
-
-        return parsed_json
+        return ParsedPage.of(html).params_json(discriminator, index)
 
     except json.JSONDecodeError as e:
         print(f"Error parsing JSON: {e}")
@@ -78,7 +539,9 @@ def extract_params_json(html, discriminator="__PARAMS__", index=0):
         return None
 
 
-def extract_script_with_id_json(html: str, discriminator: str, index: int = 0):
+def extract_script_with_id_json(
+    html: str, discriminator: str, index: int = 0, paths: tuple = ()
+):
     """
     For scripts like <script id="__NEXT_DATA__" type="application/json">
     ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
@@ -90,38 +553,16 @@ def extract_script_with_id_json(html: str, discriminator: str, index: int = 0):
 
     Args:
         html (str): The HTML content from which to extract the JSON data.
+        paths (tuple): Optional dotted paths, e.g. ("props.pageProps.data",).
+            Only these subtrees are decoded; see extract_json_paths.
 
     Returns:
         dict: The parsed JSON data, or None if no __PARAMS__ variable
               was found, or if the JSON could not be parsed.
+              With paths, a dict of path -> decoded subtree instead.
     """
     try:
-        # Use Scrapy's Selector to locate the script tag containing "__PARAMS__"
-        sel = Selector(text=html)
-
-        # Extract the script content that contains 'window.__PARAMS__'
-        # selected_script = sel.xpath(f'//script[contains(text(), "{discriminator}")]/text()').extract_first()
-        # xpath = '//script[@id="__NEXT_DATA__" and @type="application/json"]/text()'
-        scripts = sel.xpath(
-            f'//script[@id="{discriminator}" and @type="application/json"]/text()'
-        )
-
-        if 0 <= index < len(scripts):
-            selected_script = scripts[index].get()
-        else:
-            return None
-
-        # Replace 'undefined' with 'null' to make the JSON valid
-        json_data = selected_script.replace("undefined", "null")
-
-        # Parse the JSON string
-        parsed_json = json.loads(json_data)
-
-        # Debugging: Print parsed JSON to verify it worked
-        # print("Parsed JSON:")
-        # print(json.dumps(parsed_json, indent=4))
-
-        return parsed_json
+        return ParsedPage.of(html).script_json(discriminator, index, paths)
 
     except json.JSONDecodeError as e:
         print(f"Error parsing JSON: {e}")
@@ -163,20 +604,13 @@ def extract_with_xpath(html, pattern, delete_pattern=None, index=0):
         else:
             return None
 
-        # Remove 'window.__PARAMS__ =' and trailing semicolon
-        json_data = (
-            selected_script.strip()
-            .replace(f"{delete_pattern}", "")
-            .rstrip(";")
-            .replace("\u200c", "")
-            .replace("\r\n", "")
-        )
-
-        # Replace 'undefined' with 'null' to make the JSON valid
-        json_data = json_data.replace("undefined", "null")
+        # Skip 'window.__PARAMS__ =' and trailing semicolon, then replace
+        # bare 'undefined' with 'null' to make the JSON valid
+        start, end = js_value_bounds(selected_script, delete_pattern)
+        json_data = normalise_js(selected_script, start, end, clean=True)
 
         # Parse the JSON string
-        parsed_json = json.loads(json_data)
+        parsed_json = json_loads(json_data)
 
         # Debugging: Print parsed JSON to verify it worked
         # print("Parsed JSON:")
@@ -1,14 +1,30 @@
 # channel 4 __init__.py
 from base_loader import BaseLoader
-from parsing_utils import extract_params_json, split_options
+from parsing_utils import (
+    extract_params_json,
+    register_query,
+    search_query,
+    split_options,
+)
 from rich.console import Console
-import subprocess
 import sys
-import jmespath
 
 
 console = Console()
 
+# jmespath queries, compiled once at import
+register_query(
+    "ALL4",
+    "search_results",
+    """
+    [*].{
+        href: hrefLink,
+        label: labelText,
+        overlaytext: overlayText
+    }
+""",
+)
+
 
 class All4Loader(BaseLoader):
     # global options
@@ -68,20 +84,8 @@ class All4Loader(BaseLoader):
         self.options_list = split_options(All4Loader.options)
         # direct download
         if "http" in search_term and inx == 1:
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "ALL4", search_term]
-                else:
-                    command = ["devine", "dl", *self.options_list, "ALL4", search_term]
-                subprocess.run(command)
-                return
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
-                return
+            self.download(search_term)
+            return
 
         # keyword search
         elif inx == 3:
@@ -199,30 +203,17 @@ class All4Loader(BaseLoader):
                         "title": item.get("title", "Title unknown"),
                         "url": item.get("hrefLink"),
                         "synopsis": item["summary"] or None,
+                        "episode_no": item.get("episodeNumber"),
                     }
                 except KeyError:
                     continue  # Skip any episode that doesn't have the required information
                 self.add_episode(series_name, episode)
 
-        self.options_list = split_options(self.options)
-
         if self.get_number_of_episodes(series_name) == 1:
             item = self.get_series(series_name)[0]
             url = "https://www.channel4.com" + item["url"]
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "ALL4", url]
-                else:
-                    command = ["devine", "dl", *self.options_list, "ALL4", url]
-                subprocess.run(command)
-                return None
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
-                return
+            self.download(url, label=item["title"])
+            return None
 
         self.prepare_series_for_episode_selection(
             series_name
@@ -232,25 +223,12 @@ class All4Loader(BaseLoader):
         )
 
         # specific to ALL4
-        for item in selected_final_episodes:
-            url = item.split(",")[2].lstrip()
-            if url == "None":
-                print(f"No valid URL for {item.split(',')[1]}")
-                continue
-            url = "https://www.channel4.com" + url
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "ALL4", url]
-                else:
-                    command = ["devine", "dl", *self.options_list, "ALL4", url]
-                subprocess.run(command)
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
-                return
+        self.queue_series_downloads(
+            selected_final_episodes,
+            url,
+            url=lambda item: item["url"] and "https://www.channel4.com" + item["url"],
+        )
+        self.wait_for_downloads()
 
         return
 
@@ -275,15 +253,7 @@ class All4Loader(BaseLoader):
             # and, in this case, produces a simple dict from which
             # res(ults) are more easily extracted.
             # C4 specific
-            res = jmespath.search(
-                """
-            [*].{
-                href: hrefLink,
-                label: labelText,
-                overlaytext: overlayText            
-            } """,
-                myjson,
-            )
+            res = search_query("ALL4", "search_results", myjson)
 
             # Build the beaupylist for display
             for i, item in enumerate(res):
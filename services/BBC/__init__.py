@@ -3,15 +3,33 @@
 The BBC does not use  script = window.__PARAMS__ = ..."""
 
 from base_loader import BaseLoader
-from parsing_utils import extract_params_json, parse_json, split, split_options
+from parsing_utils import (
+    extract_params_json,
+    parse_json,
+    register_query,
+    search_query,
+    split,
+    split_options,
+)
 from rich.console import Console
-import subprocess
-import jmespath
 from scrapy.selector import Selector
 import json
 
 console = Console()
 
+# jmespath queries, compiled once at import
+register_query(
+    "BBC",
+    "category_episodes",
+    """
+    bundles[*].entities[*].episode[].{
+        href: id,
+        label: title.default,
+        overlaytext: synopsis.small
+    }
+""",
+)
+
 """
 Note: The BBC is outrageously awkward. Do not use this as a template for other services!
 """
@@ -22,9 +40,17 @@ Note: The BBC is outrageously awkward. Do not use this as a template for other s
 ## and increment by 1 for each subsequent page
 PAGE = 1
 
+
+def parse_uhd_list(html):
+    """Links to programmes listed on iPlayer's UHD help page."""
+    sel = Selector(text=html)
+    return sel.xpath("(//ul)[8]//a/@href").getall()
+
+
 class BbcLoader(BaseLoader):
     HLG = None
     options = None
+    devine_service = "iP"
 
     def __init__(self):
         # self.HLG = None
@@ -48,10 +74,8 @@ class BbcLoader(BaseLoader):
         """
 
         uhd_url = "https://www.bbc.co.uk/iplayer/help/questions/programme-availability/uhd-content"
-        html = self.get_data(uhd_url)
-        sel = Selector(text=html)
-        uhd_list = sel.xpath("(//ul)[8]//a/@href").getall()
-        return uhd_list
+        # shared with any concurrent lookup: one fetch, one parse
+        return self.get_parsed(uhd_url, parse_uhd_list)
 
     def receive(
         self, inx: None, search_term: None, category=None, hlg_status=False, opts=None
@@ -104,42 +128,9 @@ class BbcLoader(BaseLoader):
             self.options_list = split_options(BbcLoader.options)
 
             if BbcLoader.HLG and self.AVAILABLE_HLG:
-                try:
-                    command = (
-                        [
-                            "devine",
-                            "dl",
-                            *self.options_list,
-                            "--range",
-                            "HLG",
-                            "iP",
-                            search_term,
-                        ]
-                        if self.options_list
-                        else ["devine", "dl", "iP", search_term]
-                    )
-                    subprocess.run(command)
-                except Exception as e:
-                    print(
-                        "Error downloading video:",
-                        e,
-                        "Is devine installed correctly via 'pip install devine?",
-                    )
-
+                self.download(search_term, extra=("--range", "HLG"))
             else:
-                try:
-                    command = (
-                        ["devine", "dl", *self.options_list, "iP", search_term]
-                        if self.options_list
-                        else ["devine", "dl", "iP", search_term]
-                    )
-                    subprocess.run(command)
-                except Exception as e:
-                    print(
-                        "Error downloading video:",
-                        e,
-                        "Is devine installed correctly via 'pip install devine?",
-                    )
+                self.download(search_term)
 
             return
 
@@ -330,28 +321,10 @@ class BbcLoader(BaseLoader):
                 if series_name.lower() in hlg_item:
                     self.AVAILABLE_HLG = True
                     break
-            # self.options_list = split_options(self.options)
-            try:
-                if BbcLoader.HLG and self.AVAILABLE_HLG:
-                    subprocess.run(
-                        [
-                            "devine",
-                            "dl",
-                            *self.options_list,
-                            "--range",
-                            "HLG",
-                            "iP",
-                            url,
-                        ]
-                    )
-                else:
-                    subprocess.run(["devine", "dl", *self.options_list, "iP", url])
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
+            if BbcLoader.HLG and self.AVAILABLE_HLG:
+                self.download(url, extra=("--range", "HLG"))
+            else:
+                self.download(url)
             return
 
         self.prepare_series_for_episode_selection(
@@ -369,17 +342,15 @@ class BbcLoader(BaseLoader):
                 if series_name.lower() in hlg_item:
                     self.AVAILABLE_HLG = True
                     break
-            for part in item.split(","):
-                if "https" in part:
-                    url = part.strip()
-                    break
+            url = item["url"]
 
             if BbcLoader.HLG and self.AVAILABLE_HLG:
-                subprocess.run(
-                    ["devine", "dl", *self.options_list, "--range", "HLG", "iP", url]
+                self.queue_episode_download(
+                    url, extra=("--range", "HLG"), label=item["title"]
                 )
             else:
-                subprocess.run(["devine", "dl", *self.options_list, "iP", url])
+                self.queue_episode_download(url, label=item["title"])
+        self.wait_for_downloads()
 
         return
 
@@ -393,8 +364,8 @@ class BbcLoader(BaseLoader):
         """
         beaupylist = []
 
-        req = self.client.get(browse_url, headers=self.headers)
-        init_data = extract_params_json(req.content.decode(), "__IPLAYER_REDUX_STATE__")
+        req = self.get_data(browse_url, headers=self.headers)
+        init_data = extract_params_json(req, "__IPLAYER_REDUX_STATE__")
 
         """
         # for bug fixing
@@ -408,16 +379,7 @@ class BbcLoader(BaseLoader):
         # console.print_json(data=myjson)
         category = myjson["bundles"][0]["id"]
 
-        res = jmespath.search(
-            """
-            bundles[*].entities[*].episode[].{
-                href: id,
-                label: title.default,
-                overlaytext: synopsis.small
-            }
-            """,
-            myjson,
-        )
+        res = search_query("BBC", "category_episodes", myjson)
         # console.print_json(data=res)
 
         seen_titles = set()  # To track seen titles
@@ -1,13 +1,52 @@
 from base_loader import BaseLoader
-from parsing_utils import rinse, split_options, extract_script_with_id_json
-import subprocess
+from parsing_utils import rinse, split_options, extract_script_with_id_json, register_query, search_query
 from rich.console import Console
-import jmespath
-import re
 
 
 console = Console()
 
+# jmespath queries, compiled once at import
+register_query(
+    "ITVX",
+    "search_results",
+    """
+    results[?data.tier=='FREE'].{
+    api1: data.legacyId.officialFormat,
+    title: data.[programmeTitle, filmTitle, specialTitle],
+    synopsis: data.synopsis
+    }
+""",
+)
+register_query(
+    "ITVX",
+    "episodes",
+    """
+    [].titles[].{
+    episode: episode
+    eptitle: episodeTitle
+    series: series
+    magniurl: playlistUrl
+    description: description
+    episodeId: episodeId
+    letterA: encodedEpisodeId.letterA
+    contentInfo: contentInfo
+    channel: channel
+    }
+""",
+)
+register_query(
+    "ITVX",
+    "category_items",
+    """
+    [].{
+        title: titleSlug,
+        programmeId: encodedProgrammeId.letterA,
+        episodeId: encodedEpisodeId.letterA,
+        synopsis: description
+    }
+""",
+)
+
 
 class ItvxLoader(BaseLoader):
     options = ""
@@ -50,20 +89,7 @@ class ItvxLoader(BaseLoader):
         self.options_list = split_options(ItvxLoader.options)
         # direct download
         if "http" in search_term and inx == 1:
-            self.options_list = split_options(self.options)
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "ITVX", search_term]
-                else:
-                    command = ["devine", "dl", *self.options_list, "ITVX", search_term]
-                subprocess.run(command)
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
-
+            self.download(search_term)
             return
 
         # keyword search
@@ -109,15 +135,7 @@ class ItvxLoader(BaseLoader):
         parsed_data = self.parse_data(html)
 
         # select only from FREE tier
-        res = jmespath.search(
-            """
-        results[?data.tier=='FREE'].{
-        api1: data.legacyId.officialFormat,
-        title: data.[programmeTitle, filmTitle, specialTitle],
-        synopsis: data.synopsis
-        } """,
-            parsed_data,
-        )
+        res = search_query("ITVX", "search_results", parsed_data)
 
         for item in res:
             api1 = item["api1"].replace("/", "a")
@@ -160,7 +178,17 @@ class ItvxLoader(BaseLoader):
         except Exception:
             print(f"No valid data at {url} found.\n Exiting")
             return
-        parsed_data = extract_script_with_id_json(myhtml, "__NEXT_DATA__", 0)
+        # decode only the parts of the (large) page data used below
+        parsed_data = extract_script_with_id_json(
+            myhtml,
+            "__NEXT_DATA__",
+            0,
+            paths=(
+                "query.programmeSlug",
+                "query.programmeId",
+                "props.pageProps.seriesList",
+            ),
+        )
         self.clear_series_data()  # Clear existing series data
 
         """
@@ -170,34 +198,11 @@ class ItvxLoader(BaseLoader):
         f.write(myhtml)
         f.close()"""
 
-        url_data = jmespath.search(
-            """
-        query.{
-        programmeSlug: programmeSlug
-        programmeId: programmeId                                               
-        }""",
-            parsed_data,
-        )
-        programmeSlug = url_data["programmeSlug"]
-        programmeId = url_data["programmeId"]
-
-        mytitles = jmespath.search("props.pageProps", parsed_data)
-        res = jmespath.search(
-            """
-        seriesList[].titles[].{
-        episode: episode
-        eptitle: episodeTitle
-        series: series            
-        magniurl: playlistUrl
-        description: description
-        episodeId: episodeId
-        letterA: encodedEpisodeId.letterA
-        contentInfo: contentInfo
-        channel: channel
-  
-        } """,
-            mytitles,
-        )
+        programmeSlug = parsed_data.get("query.programmeSlug")
+        programmeId = parsed_data.get("query.programmeId")
+
+        series_list = parsed_data.get("props.pageProps.seriesList")
+        res = search_query("ITVX", "episodes", series_list)
 
         for item in res:
             try:
@@ -214,6 +219,7 @@ class ItvxLoader(BaseLoader):
                     "title": f"{item['episode'] or ''}:{item['eptitle'] or ''}",
                     "url": f"https://www.itv.com/watch/{programmeSlug}/{programmeId}/{item['letterA']}",
                     "synopsis": rinse(item["description"]) or None,
+                    "episode_no": item["episode"],
                 }
             except KeyError:
                 continue  # Skip any episode that doesn't have the required information
@@ -226,26 +232,11 @@ class ItvxLoader(BaseLoader):
         selected_final_episodes = self.display_final_episode_list(
             self.final_episode_data
         )
-        self.options_list = split_options(self.options)
-        for item in selected_final_episodes:
-            url = item.split(",")[2].lstrip()
-            if 'http' not in url:
-                url_pattern = r'https?://[^\s,]+'
-                match = re.search(url_pattern, item)
-                if match:
-                    url = match.group()
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "ITVX", url]
-                else:
-                    command = ["devine", "dl", *self.options_list, "ITVX", url]
-                subprocess.run(command)
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
+        self.queue_series_downloads(
+            selected_final_episodes,
+            f"https://www.itv.com/watch/{programmeSlug}/{programmeId}",
+        )
+        self.wait_for_downloads()
 
         return None
 
@@ -265,24 +256,16 @@ class ItvxLoader(BaseLoader):
         try:
             myhtml = self.get_data(browse_url, headers=headers)
 
-            parsed_data = extract_script_with_id_json(myhtml, "__NEXT_DATA__", 0)
+            parsed_data = extract_script_with_id_json(
+                myhtml, "__NEXT_DATA__", 0, paths=("props.pageProps.collection.shows",)
+            )
 
             # jmespath is an efficient json parser that searches complex json
             # and, in this case, produces a simple dict from which
             # res(ults) are more easily extracted.
             # ITVX specific
-            mytitles = jmespath.search("props.pageProps.collection.shows", parsed_data)
-            res = jmespath.search(
-                """
-                [].{
-                    title: titleSlug,
-                    programmeId: encodedProgrammeId.letterA,
-                    episodeId: encodedEpisodeId.letterA,
-                    synopsis: description
-                }
-            """,
-                mytitles,
-            )
+            mytitles = parsed_data.get("props.pageProps.collection.shows")
+            res = search_query("ITVX", "category_items", mytitles)
 
             # Add the URL to each entry in res
             # ITV does not have a url in json data thus need to build.
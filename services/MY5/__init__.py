@@ -1,12 +1,23 @@
 from base_loader import BaseLoader
-import jmespath
 from rich.console import Console
-from parsing_utils import parse_json, split_options
-import subprocess
+from parsing_utils import parse_json, register_query, search_query, split_options
 import re
 
 console = Console()
 
+# jmespath queries, compiled once at import
+register_query(
+    "MY5",
+    "search_results",
+    """
+    [*].{
+        href: f_name,
+        label: title,
+        overlaytext: s_desc
+    }
+""",
+)
+
 
 class My5Loader(BaseLoader):
     options = ""
@@ -50,12 +61,7 @@ class My5Loader(BaseLoader):
         # direct download
 
         if "http" in search_term and inx == 1:
-            # options_list = split_options(self.options)
-            if self.options_list[0] == "":
-                command = ["devine", "dl", "MY5", search_term]
-            else:
-                command = ["devine", "dl", *self.options_list, "MY5", search_term]
-            subprocess.run(command)
+            self.download(search_term)
 
             return
 
@@ -130,19 +136,7 @@ class My5Loader(BaseLoader):
         """
         if "https" in selected:  # direct url: not sure how this may happen with My5??
             url = selected
-            self.options_list = split_options(self.options)
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "MY5", url]
-                else:
-                    command = ["devine", "dl", *self.options_list, "MY5", url]
-                subprocess.run(command)
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
+            self.download(url)
             return
         else:
             url = self.get_selected_url(selected)
@@ -158,6 +152,7 @@ class My5Loader(BaseLoader):
         # Extract the episodes from the parsed data of the selected series
         brndslug = url.split("/")[4]
         if parsed_data and "seasons" in parsed_data:
+            season_urls = []
             for item in parsed_data["seasons"]:
                 try:
                     # no season means single episode
@@ -169,7 +164,17 @@ class My5Loader(BaseLoader):
                     else:
                         url = f"https://corona.channel5.com/shows/{brndslug}/seasons/{item['seasonNumber']}/episodes.json?platform=my5desktop&friendly=1&linear=true"
                     url = url.encode("utf-8", "ignore").decode().strip()
-                    myhtml = self.get_data(url=url)
+                    season_urls.append(url)
+                except KeyError:
+                    continue  # Skip any season that doesn't have the required information
+
+            # fetch every season at once; pages come back in season order
+            season_pages = self.get_data_many(season_urls, return_exceptions=True)
+            for season_url, myhtml in zip(season_urls, season_pages):
+                if isinstance(myhtml, Exception):
+                    print(f"Skipping season {season_url}: {myhtml}")
+                    continue
+                try:
                     parsed_data = parse_json(myhtml)
                     if len(parsed_data["episodes"]) == 0:
                         continue
@@ -181,6 +186,7 @@ class My5Loader(BaseLoader):
                             "title": f"{item['ep_num'] or ''}:{item['title'] or ''}",
                             "url": f"https://www.channel5.com/{item['sh_f_name']}/{item['sea_f_name']}/{item['f_name']}",
                             "synopsis": item["s_desc"] or None,
+                            "episode_no": item["ep_num"],
                         }
                         self.add_episode(series_name, episode)
                 except KeyError:
@@ -195,30 +201,10 @@ class My5Loader(BaseLoader):
 
         # download
 
-        self.options_list = split_options(self.options)
-        for item in selected_final_episodes:
-            url = item.split(",")[2].lstrip()
-            if url == "None":
-                print(f"No valid URL for {item.split(',')[1]}")
-                continue
-            if 'http' not in url:
-                url_pattern = r'https?://[^\s,]+'
-                match = re.search(url_pattern, item)
-                if match:
-                    url = match.group()
-
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "MY5", url]
-                else:
-                    command = ["devine", "dl", *self.options_list, "MY5", url]
-                subprocess.run(command)
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
+        self.queue_series_downloads(
+            selected_final_episodes, f"https://www.channel5.com/show/{brndslug}"
+        )
+        self.wait_for_downloads()
         return
 
     def fetch_videos_by_category(self, browse_url):
@@ -242,15 +228,7 @@ class My5Loader(BaseLoader):
             # and, in this case, produces a simple dict from which
             # res(ults) are more easily extracted.
             # C4 specific
-            res = jmespath.search(
-                """
-            [*].{
-                href: f_name,
-                label: title,
-                overlaytext: s_desc            
-            } """,
-                myjson,
-            )
+            res = search_query("MY5", "search_results", myjson)
 
             # Build the beaupylist for display
             for i, item in enumerate(res):
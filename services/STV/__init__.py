@@ -1,13 +1,31 @@
 from base_loader import BaseLoader
-from parsing_utils import extract_script_with_id_json, parse_json, split_options
-import subprocess
+from parsing_utils import (
+    extract_script_with_id_json,
+    json_loads,
+    parse_json,
+    register_query,
+    search_query,
+    split_options,
+)
 from rich.console import Console
-import jmespath
 import re
 import json
 
 console = Console()
 
+# jmespath queries, compiled once at import
+register_query(
+    "STV",
+    "category_items",
+    """
+    [].{
+        label: title,
+        overlaytext: description,
+        href: link
+        }
+""",
+)
+
 
 class StvLoader(BaseLoader):
     options = ""
@@ -52,19 +70,7 @@ class StvLoader(BaseLoader):
         # direct download
 
         if "http" in search_term and inx == 1:
-            try:
-                self.options_list = split_options(StvLoader.options)
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "STV", search_term]
-                else:
-                    command = ["devine", "dl", *self.options_list, "STV", search_term]
-                subprocess.run(command)  # url
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
+            self.download(search_term)
 
             return
 
@@ -136,8 +142,8 @@ class StvLoader(BaseLoader):
             "spelling": "strict",
         }
 
-        response = self.post_data(url, headers=headers, json=json)
-        parsed_data = response.json()  #
+        response = self.post_data(url, headers=headers, json=json, cache=True)
+        parsed_data = json_loads(response.content)
         mydata = parsed_data["records"]["page"]
 
         for item in mydata:
@@ -173,7 +179,11 @@ class StvLoader(BaseLoader):
         except Exception:
             print(f"No valid data at {url} found.\n Exiting")
             return
-        parsed_data = extract_script_with_id_json(myhtml, "__NEXT_DATA__", 0)
+        # decode only props.pageProps.data; the rest of the page data is unused
+        parsed_data = extract_script_with_id_json(
+            myhtml, "__NEXT_DATA__", 0, paths=("props.pageProps.data",)
+        )
+        page_data = parsed_data["props.pageProps.data"]
         self.clear_series_data()  # Clear existing series data
 
         '''console.print_json(data=parsed_data) # for debugging
@@ -181,10 +191,8 @@ class StvLoader(BaseLoader):
         f.write(json.dumps(parsed_data))
         f.close()'''
 
-        series_data = parsed_data["props"]["pageProps"]["data"]["programmeHeader"][
-            "name"
-        ]
-        tabs = len(parsed_data["props"]["pageProps"]["data"]["tabs"])
+        series_data = page_data["programmeHeader"]["name"]
+        tabs = len(page_data["tabs"])
         headers = {
             'User-Agent': 'Mozilla/5.0 (X11; Linux x86_64; rv:138.0) Gecko/20100101 Firefox/138.0',
             'Accept': '*/*',
@@ -209,16 +217,16 @@ class StvLoader(BaseLoader):
 
 
         try:
-            PROGGUID = parsed_data["props"]["pageProps"]["data"]["programmeData"]["guid"]
+            PROGGUID = page_data["programmeData"]["guid"]
         except Exception:
             PROGGUID = None
 
         if PROGGUID:
         
-            for item in parsed_data["props"]["pageProps"]["data"]["tabs"][0]["data"]:
+            for item in page_data["tabs"][0]["data"]:
                 
                 try:
-                    series_no = parsed_data["props"]["pageProps"]["data"]["tabs"][0]["title"]
+                    series_no = page_data["tabs"][0]["title"]
                     if "Episode" in series_no:
                         series_no = 100
                     else:
@@ -229,9 +237,7 @@ class StvLoader(BaseLoader):
 
                     episode = {
                         "series_no": series_no,
-                        "title": title.replace(
-                            ", ", "-"
-                        ),  # data with comma messes up later when selecting url
+                        "title": title,
                         "url": url,
                         "synopsis": synopsis,
                     }
@@ -241,24 +247,30 @@ class StvLoader(BaseLoader):
                     print(f"Error: {e}")
 
         if tabs > 1:
+            episode_urls = []
             for index in range(1, tabs):
                 # last few tabs may not contain series so check
                 if (
-                    "Autoplay"
-                    in parsed_data["props"]["pageProps"]["data"]["tabs"][index]["title"]
-                    or "Trailer"
-                    in parsed_data["props"]["pageProps"]["data"]["tabs"][index]["title"]
+                    "Autoplay" in page_data["tabs"][index]["title"]
+                    or "Trailer" in page_data["tabs"][index]["title"]
                 ):
                     break
 
-                series_guid = parsed_data["props"]["pageProps"]["data"]["tabs"][index][
-                    "params"
-                ]["query"]["series.guid"]
-
-                response = self.get_data(
-                    f"https://player.api.stv.tv/v1/episodes?series.guid={series_guid}&limit=100&groupToken=0071",
-                    headers=headers,
+                series_guid = page_data["tabs"][index]["params"]["query"][
+                    "series.guid"
+                ]
+                episode_urls.append(
+                    f"https://player.api.stv.tv/v1/episodes?series.guid={series_guid}&limit=100&groupToken=0071"
                 )
+
+            # fetch every series tab at once; results keep tab order
+            responses = self.get_data_many(
+                episode_urls, headers=headers, return_exceptions=True
+            )
+            for episode_url, response in zip(episode_urls, responses):
+                if isinstance(response, Exception):
+                    print(f"Skipping series {episode_url}: {response}")
+                    continue
                 next_parsed_data = parse_json(response)
 
                 '''console.print_json(data=next_parsed_data)
@@ -291,21 +303,9 @@ class StvLoader(BaseLoader):
         selected_final_episodes = self.display_final_episode_list(
             self.final_episode_data
         )
-        self.options_list = split_options(self.options)
         for item in selected_final_episodes:
-            url = item.split(",")[2].lstrip()
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "STV", url]
-                else:
-                    command = ["devine", "dl", *self.options_list, "STV", url]
-                subprocess.run(command)
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
+            self.queue_episode_download(item["url"], label=item["title"])
+        self.wait_for_downloads()
         return None
 
     def fetch_videos_by_category(self, browse_url):
@@ -321,7 +321,9 @@ class StvLoader(BaseLoader):
             req = self.get_data(browse_url, headers=self.headers)
 
             # Parse the __PARAMS__ data
-            init_data = extract_script_with_id_json(req, "__NEXT_DATA__", 0)
+            init_data = extract_script_with_id_json(
+                req, "__NEXT_DATA__", 0, paths=("props.pageProps.data.assets",)
+            )
 
             """console.print_json(data=init_data)
             f = open("cat_stv.json",'w')
@@ -329,23 +331,14 @@ class StvLoader(BaseLoader):
             f.close()"""
             # Extract brand items
 
-            myjson = jmespath.search("props.pageProps.data.assets", init_data)
+            myjson = init_data.get("props.pageProps.data.assets")
 
             # jmespath is an efficient json parser that searches complex json
             # and, in this case, produces a simple dict from which
             # res(ults) are more easily extracted.
             # STV specific
 
-            res = jmespath.search(
-                """
-                [].{
-                    label: title,
-                    overlaytext: description,
-                    href: link
-                    }
-                    """,
-                myjson,
-            )
+            res = search_query("STV", "category_items", myjson)
 
             # Build the beaupylist for display
             for i, item in enumerate(res):
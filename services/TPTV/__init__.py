@@ -1,10 +1,9 @@
 from base_loader import BaseLoader
-from parsing_utils import extract_script_with_id_json, parse_json, split_options
-import subprocess
+from episodes import Episode
+from parsing_utils import extract_script_with_id_json, json_loads, parse_json, split_options
 from rich.console import Console
 import jmespath
 import re
-import json
 from beaupy import select_multiple
 
 console = Console()
@@ -55,7 +54,7 @@ class TptvLoader(BaseLoader):
         if r.status_code != 200:
             raise ConnectionError   
         else:
-            self.session_id = r.json()['id']
+            self.session_id = json_loads(r.content)['id']
       
 
     def receive(
@@ -89,20 +88,7 @@ class TptvLoader(BaseLoader):
         # direct download
 
         if "http" in search_term and inx == 1:
-            try:
-                self.options_list = split_options(TptvLoader.options)
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "TPTV", search_term]
-                else:
-                    command = ["devine", "dl", *self.options_list, "TPTV", search_term]
-                subprocess.run(command)  # url
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
-
+            self.download(search_term)
             return
 
         # keyword search
@@ -153,7 +139,7 @@ class TptvLoader(BaseLoader):
         get_headers['session'] = self.session_id
         get_headers['tenant'] = 'encore'                                                                         
         response = self.get_data(suggested_url, headers=get_headers)
-        myjson = json.loads(response)
+        myjson = json_loads(response)
         
         myitems = []       
         for item in myjson['data']:
@@ -162,7 +148,7 @@ class TptvLoader(BaseLoader):
                 collection_url = f"https://prod.suggestedtv.com/api/client/v1/collection/by-reference/{id}?extend=label"
                 response = self.get_data(collection_url, headers=get_headers)
                 if response:
-                    data = json.loads(response)
+                    data = json_loads(response)
                     for item in data['children']:
                         myitems.append(item['id'].replace('product_',''))
             elif item.startswith('product_'):
@@ -172,7 +158,7 @@ class TptvLoader(BaseLoader):
         continued_search_url = "https://prod.suggestedtv.com/api/client/v1/product?ids=" + mystring + "&extend=label"
         
         response = self.get_data(continued_search_url, headers=get_headers)
-        data = json.loads(response)
+        data = json_loads(response)
         try:
             for item in data['data']:
                 vid_id = item['reference']
@@ -192,7 +178,7 @@ class TptvLoader(BaseLoader):
         eps = self.get_series()
         beaupylist = []
         for entry in eps.values():
-            if entry and isinstance(entry[0], dict):  # guard clause for safety
+            if entry and isinstance(entry[0], Episode):  # guard clause for safety
                 beaupylist.append([entry[0]['title'], entry[0]['synopsis'], entry[0]['url']])
         selected = select_multiple(beaupylist, preprocessor=lambda val: prettify(val),  page_size=6, pagination=True)  
 
@@ -204,23 +190,12 @@ class TptvLoader(BaseLoader):
 
     def second_fetch(self, selected):
    
-        self.options_list = split_options(self.options)
         for item in selected:
             url = item[2]
             url = f"https://tptvencore.co.uk/product/{url}"
             #print(url)
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "TPTV", url]
-                else:
-                    command = ["devine", "dl", *self.options_list, "TPTV", url]
-                subprocess.run(command)
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
+            self.queue_episode_download(url, label=item[0])
+        self.wait_for_downloads()
         return None
 
     def fetch_videos_by_category(self, browse_url):
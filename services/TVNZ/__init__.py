@@ -2,7 +2,6 @@
 from base_loader import BaseLoader
 from parsing_utils import split_options, list_prettify
 from rich.console import Console
-import subprocess
 from beaupy import select_multiple
 
 console = Console()
@@ -70,20 +69,8 @@ class TvnzLoader(BaseLoader):
         # direct download
 
         if "http" in search_term and inx == 1:
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "TVNZ", search_term]
-                else:
-                    command = ["devine", "dl", *self.options_list, "TVNZ", search_term]
-                subprocess.run(command)
-                return
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
-                return
+            self.download(search_term)
+            return
 
         # keyword search
         elif inx == 3:
@@ -198,12 +185,8 @@ class TvnzLoader(BaseLoader):
                 )
 
                 for item in selected:
-                    url = item[1]
-                    if self.options_list[0] == "":
-                        command = ["devine", "dl", "TVNZ", url]
-                    else:
-                        command = ["devine", "dl", *self.options_list, "TVNZ", url]
-                    subprocess.run(command)
+                    self.queue_episode_download(item[1], label=item[0])
+                self.wait_for_downloads()
                 return None
 
             elif type == "show" or type == "showVideo":
@@ -212,24 +195,11 @@ class TvnzLoader(BaseLoader):
                     html = self.get_data(url)
                     parsed_data = self.parse_data(html)
                 except Exception:
-                    try:
-                        # direct download as seems only one episode
-                        # https://www.tvnz.co.nz/shows/circle-of-friends/movie/s1-e1
-                        url = f"https://www.tvnz.co.nz/shows/{series_name}/movie/s1-e1"
-                        if self.options_list[0] == "":
-                            command = ["devine", "dl", "TVNZ", url]
-                        else:
-                            command = ["devine", "dl", *self.options_list, "TVNZ", url]
-                        subprocess.run(command)
-                        return
-
-                    except Exception as e:
-                        print(
-                            "Error downloading video:",
-                            e,
-                            "Is devine installed correctly via 'pip install devine?",
-                        )
-                        return
+                    # direct download as seems only one episode
+                    # https://www.tvnz.co.nz/shows/circle-of-friends/movie/s1-e1
+                    url = f"https://www.tvnz.co.nz/shows/{series_name}/movie/s1-e1"
+                    self.download(url)
+                    return
                 try:
                     href_list = []
                     # iterate over all seasons and capture url for each
@@ -252,9 +222,14 @@ class TvnzLoader(BaseLoader):
                     return
         # with season url, iterate over each season and capture episodes
         try:
-            for url in href_list:  #  for all seasons
-                url = "https://apis-edge-prod.tech.tvnz.co.nz" + url
-                myhtml = self.get_data(url=url)
+            season_urls = [
+                "https://apis-edge-prod.tech.tvnz.co.nz" + href for href in href_list
+            ]
+            season_pages = self.get_data_many(season_urls, return_exceptions=True)
+            for url, myhtml in zip(season_urls, season_pages):  #  for all seasons
+                if isinstance(myhtml, Exception):
+                    print(f"Skipping season {url}: {myhtml}")
+                    continue
                 parsed_data = self.parse_data(myhtml)
                 if parsed_data and "_embedded" in parsed_data:
                     try:
@@ -292,20 +267,8 @@ class TvnzLoader(BaseLoader):
                 url = item["url"]
             else:
                 url = f'https://www.tvnz.co.nz{item["url"]}'
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "TVNZ", url]
-                else:
-                    command = ["devine", "dl", *self.options_list, "TVNZ", url]
-                subprocess.run(command)
-                return None
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
-                return
+            self.download(url, label=item["title"])
+            return None
         # else present list of series and display for multiple selection
         self.prepare_series_for_episode_selection(
             series_name
@@ -316,17 +279,14 @@ class TvnzLoader(BaseLoader):
         )
 
         for item in selected_final_episodes:
-            url = item.split(",")[2].lstrip()
+            url = item["url"]
 
-            if url == "None":
-                print(f"No valid URL for {item.split(',')[1]}")
+            if not url:
+                print(f"No valid URL for {item['title']}")
                 continue
 
-            if self.options_list[0] == "":
-                command = ["devine", "dl", "TVNZ", url]
-            else:
-                command = ["devine", "dl", *self.options_list, "TVNZ", url]
-            subprocess.run(command)
+            self.queue_episode_download(url, label=item["title"])
+        self.wait_for_downloads()
 
         return
 
@@ -1,11 +1,23 @@
 from base_loader import BaseLoader
-from parsing_utils import split_options
-import jmespath
-import subprocess
+from parsing_utils import register_query, search_query, split_options
 from rich.console import Console
 
 console = Console()
 
+# jmespath queries, compiled once at import
+register_query(
+    "U",
+    "search_results",
+    """
+    [].{
+    title: name,
+    slug: slug,
+    synopsis: synopsis
+    type: type
+    }
+""",
+)
+
 
 class ULoader(BaseLoader):
     options = ""
@@ -48,20 +60,7 @@ class ULoader(BaseLoader):
 
         # direct download
         if "http" in search_term and inx == 1:
-            # options_list = split_options(ULoader.options)
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "U", search_term]
-                else:
-                    command = ["devine", "dl", *self.options_list, "U", search_term]
-                subprocess.run(command)  # url
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
-
+            self.download(search_term)
             return
 
         # keyword search
@@ -104,16 +103,7 @@ class ULoader(BaseLoader):
         parsed_data = self.parse_data(html)  # to json ()
 
         # select only from FREE tier
-        res = jmespath.search(
-            """
-            [].{
-            title: name,
-            slug: slug,
-            synopsis: synopsis
-            type: type
-            } """,
-            parsed_data,
-        )
+        res = search_query("U", "search_results", parsed_data)
 
         for item in res:
             if item["type"] == "COLLECTION":
@@ -160,11 +150,16 @@ class ULoader(BaseLoader):
             print(f"No series data found at {url}.\n Exiting")
             return
 
-        # Go through each episode in the selected series
-        for series_id in series_ids:
-            html = self.get_data(
-                f"https://vschedules.uktv.co.uk/vod/series/?id={series_id}"
-            )
+        # Fetch all series together, then go through each episode in turn
+        series_urls = [
+            f"https://vschedules.uktv.co.uk/vod/series/?id={series_id}"
+            for series_id in series_ids
+        ]
+        pages = self.get_data_many(series_urls, return_exceptions=True)
+        for series_url, html in zip(series_urls, pages):
+            if isinstance(html, Exception):
+                print(f"Skipping series {series_url}: {html}")
+                continue
             parsed_data = self.parse_data(html)
 
             try:
@@ -194,21 +189,9 @@ class ULoader(BaseLoader):
         selected_final_episodes = self.display_final_episode_list(
             self.final_episode_data
         )
-        self.options_list = split_options(self.options)
         for item in selected_final_episodes:
-            url = item.split(",")[2].lstrip()
-            try:
-                if self.options_list[0] == "":
-                    command = ["devine", "dl", "U", url]
-                else:
-                    command = ["devine", "dl", *self.options_list, "U", url]
-                subprocess.run(command)
-            except Exception as e:
-                print(
-                    "Error downloading video:",
-                    e,
-                    "Is devine installed correctly via 'pip install devine?",
-                )
+            self.queue_episode_download(item["url"], label=item["title"])
+        self.wait_for_downloads()
 
         return None
 
@@ -0,0 +1,56 @@
+"""
+queue_series_downloads sends the selected episodes of a series to devine
+as one -w run; these check what goes into that run and what is left out.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base_loader import BaseLoader  # noqa: E402
+
+SERIES_URL = "https://example.invalid/show"
+
+
+def batching_loader():
+    """A BaseLoader with batching on that records what it queues."""
+    loader = BaseLoader.__new__(BaseLoader)
+    loader.service = "TEST"
+    loader.options = ""
+    loader.download_batch = True
+    loader.skip_downloaded = False
+    loader.queued = []
+    loader.queue_download = lambda url, extra=(), label=None, episodes=(): (
+        loader.queued.append((url, extra, label, list(episodes)))
+    )
+    return loader
+
+
+def episode(title, series_no, episode_no):
+    return {
+        "title": title,
+        "url": f"https://example.invalid/{title.replace(' ', '-')}",
+        "series_no": series_no,
+        "episode_no": episode_no,
+    }
+
+
+def test_episodes_sharing_numbers_are_queued_on_their_own():
+    loader = batching_loader()
+    loader.queue_series_downloads(
+        [
+            episode("Ep 1", 1, 1),
+            episode("Ep 1 (signed)", 1, 1),
+            episode("Ep 2", 1, 2),
+            episode("Ep 3", 1, 3),
+        ],
+        SERIES_URL,
+    )
+    single = [label for url, extra, label, episodes in loader.queued if not episodes]
+    assert sorted(single) == ["Ep 1", "Ep 1 (signed)"]
+    (batched,) = [queued for queued in loader.queued if queued[3]]
+    url, extra, label, episodes = batched
+    assert url == SERIES_URL
+    assert extra == ("-w", "S01E02-S01E03")
+    assert [entry[1] for entry in episodes] == ["Ep 2", "Ep 3"]
@@ -0,0 +1,34 @@
+"""
+DownloadDispatcher bookkeeping (journal, archive, logs) must never keep a
+job's waiters or the rest of its service's queue waiting.
+"""
+
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloads import DownloadDispatcher  # noqa: E402
+
+
+class LockedJournal:
+    """A job journal another VineFeeder window holds locked."""
+
+    def add(self, job):
+        return 1
+
+    def set_state(self, job_id, state, returncode=None):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def test_jobs_finish_when_the_journal_cannot_be_written(capsys):
+    dispatcher = DownloadDispatcher(max_downloads=2, journal=LockedJournal())
+    command = [sys.executable, "-c", "pass"]
+    jobs = [dispatcher.submit("TEST", command, workers=1) for _ in range(3)]
+    for job in jobs:
+        assert job.future.result(timeout=30) is job
+        assert job.ok
+    assert dispatcher.running["TEST"] == 0
+    assert "database is locked" in capsys.readouterr().out
+    dispatcher.executor.shutdown()
@@ -0,0 +1,93 @@
+"""
+devine draws its progress with rich; these check that what rich writes
+reaches a job's progress as it is written, not only once devine exits.
+"""
+
+import io
+import os
+import sys
+import textwrap
+import threading
+import time
+
+import pytest
+from rich.console import Console
+from rich.progress import BarColumn, Progress, TextColumn
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from downloads import DownloadJob, get_backend  # noqa: E402
+
+COLUMNS = (
+    TextColumn("Downloading"),
+    BarColumn(),
+    TextColumn("{task.percentage:>3.0f}%"),
+    TextColumn("{task.fields[speed]}"),
+)
+
+CHILD = textwrap.dedent(
+    """
+    import sys
+    import time
+    from rich.progress import BarColumn, Progress, TextColumn
+    columns = (
+        TextColumn("Downloading"),
+        BarColumn(),
+        TextColumn("{task.percentage:>3.0f}%"),
+        TextColumn("5.2 MB/s"),
+    )
+    with Progress(*columns, refresh_per_second=20) as progress:
+        task = progress.add_task("video", total=10)
+        for _ in range(10):
+            time.sleep(0.15)
+            progress.advance(task)
+    print("ERROR: licence request refused", file=sys.stderr)
+    """
+)
+
+
+def rich_progress_output():
+    """What a rich Progress writes to a terminal as it goes from 0 to 100%."""
+    file = io.StringIO()
+    console = Console(file=file, force_terminal=True, force_interactive=True, width=100)
+    with Progress(*COLUMNS, console=console, auto_refresh=False) as progress:
+        task = progress.add_task("video", total=10, speed="5.2 MB/s")
+        for _ in range(10):
+            progress.advance(task)
+            progress.refresh()
+    return file.getvalue()
+
+
+def test_feed_reads_rich_progress_as_it_arrives():
+    job = DownloadJob("TEST", ["devine", "dl", "TEST", "https://example.invalid/1"])
+    output = rich_progress_output()
+    seen = []
+    for i in range(0, len(output), 7):
+        job.feed("stdout", output[i : i + 7])
+        seen.append(job.progress.percent)
+    job.close_output()
+    percents = sorted({percent for percent in seen if percent is not None})
+    assert percents[0] < 50 < percents[-1] == 100
+    assert len(percents) >= 5
+    assert job.progress.phase == "downloading"
+    assert job.progress.speed == 5.2 * 1024**2
+
+
+@pytest.mark.parametrize("terminal", [True, False], ids=["pty", "pipes"])
+def test_subprocess_progress_streams_while_running(monkeypatch, terminal):
+    if terminal and not hasattr(os, "openpty"):
+        pytest.skip("no pseudo-terminals here")
+    if not terminal:
+        monkeypatch.setattr("downloads.open_terminal", lambda: None)
+    job = DownloadJob("TEST", [sys.executable, "-c", CHILD])
+    runner = threading.Thread(target=get_backend("subprocess").run, args=(job,))
+    runner.start()
+    seen = set()
+    while runner.is_alive():
+        seen.add(job.progress.percent)
+        time.sleep(0.02)
+    assert job.returncode == 0
+    running = {percent for percent in seen if percent is not None and percent < 100}
+    assert len(running) >= 3, running
+    assert "licence request refused" in job.stderr
+    assert "licence request refused" not in job.stdout
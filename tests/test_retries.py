@@ -0,0 +1,69 @@
+"""
+BaseLoader's retries and per-host circuit breaker, against a stub server.
+"""
+
+import os
+import sys
+from collections import Counter
+
+import httpx
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from base_loader import (  # noqa: E402
+    DEFAULT_RETRY_SETTINGS,
+    BaseLoader,
+    FetchError,
+    clients,
+    get_engine,
+)
+
+
+def stub_loader(name, handler):
+    """A BaseLoader whose requests are answered by handler(request)."""
+    loader = BaseLoader.__new__(BaseLoader)
+    loader.service = name
+    loader.headers = {}
+    loader.http_settings = {}
+    loader.cache_ttl = 0
+    loader.retry_settings = {**DEFAULT_RETRY_SETTINGS, "backoff": 0}
+    loader.rate_limit = {}
+    loader.http_stats = Counter()
+    with clients.lock:
+        clients.async_clients[name] = httpx.AsyncClient(
+            transport=httpx.MockTransport(handler)
+        )
+    return loader
+
+
+def test_breaker_counts_requests_not_attempts():
+    def handler(request):
+        status = 500 if request.url.path == "/broken" else 200
+        return httpx.Response(status, text="ok")
+
+    loader = stub_loader("RETRY_BREAKER", handler)
+    for _ in range(2):
+        with pytest.raises(FetchError):
+            loader.get_data("https://breaker.invalid/broken")
+    assert loader.http_stats["requests"] == 6
+    assert get_engine().breakers["breaker.invalid"].failures == 2
+    assert loader.get_data("https://breaker.invalid/fine") == "ok"
+
+
+def test_posts_are_retried_only_when_safe_to_repeat():
+    sent = Counter()
+
+    def handler(request):
+        sent[request.url.path] += 1
+        return httpx.Response(503)
+
+    loader = stub_loader("RETRY_POST", handler)
+    for path, options in (
+        ("/session", {}),
+        ("/search", {"cache": True}),
+        ("/query", {"idempotent": True}),
+    ):
+        with pytest.raises(FetchError):
+            loader.post_data(f"https://post.invalid{path}", json={}, **options)
+    assert sent == {"/session": 1, "/search": 3, "/query": 3}
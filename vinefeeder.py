@@ -11,6 +11,8 @@ import threading
 from pretty import pretty_print
 from rich.console import Console
 from parsing_utils import prettify
+from http_cache import ResponseCache
+from downloads import resume_downloads
 import click
 import subprocess
 
@@ -354,12 +356,24 @@ class VineFeeder(QWidget):
     is_flag=True,
     help="How to select which series you need from those available",
 )
-def cli(service_folder, list_services, select_series):
+@click.option(
+    "--clear-cache",
+    is_flag=True,
+    help="Empty the on-disk cache of fetched service pages.",
+)
+@click.option(
+    "--resume",
+    is_flag=True,
+    help="Finish the downloads an earlier session left unfinished.",
+)
+def cli(service_folder, list_services, select_series, clear_cache, resume):
     """
     python vinefeeder.py --help to show help\n
     python vinefeeder.py --list-services  to list available services\n
     python vinefeeder.py --service-folder <folder_name> to edit config.yaml
-    python vinefeeder.py --select-series  list, range or 'all'\n\n
+    python vinefeeder.py --select-series  list, range or 'all'\n
+    python vinefeeder.py --clear-cache  to empty the page cache\n
+    python vinefeeder.py --resume  to finish interrupted downloads\n\n
     In the GUI:-
     The text box will take keyword(s) or a URL for download from a button selected service.
     Or leave the text box blank for further options when the service button is clicked.\n
@@ -389,6 +403,17 @@ def cli(service_folder, list_services, select_series):
                 print(f" - {service}")
         return
 
+    # Handle --clear-cache option
+    if clear_cache:
+        ResponseCache().clear()
+        print("Page cache cleared.")
+        return
+
+    # Handle --resume option
+    if resume:
+        resume_downloads()
+        return
+
     # Handle --select-series option
     if select_series:
         print("Series Selection:")